@@ -0,0 +1,29 @@
+# Optional C extension: the Cython port of the approach march (src/sim/_kernel.pyx),
+# used by run_sim.simulate() with SIM_MARCH=cython. Needs Cython (not in
+# requirements.txt: pip install cython) and a C compiler:
+#
+#     python setup.py build_ext --inplace
+#
+# builds src/sim/_kernel.*.so next to the .pyx.
+# No -ffast-math / -march=native: reassociation and FMA contraction would let the
+# port drift from the kernels it copies (see tests/test_march_parity.py).
+import sys
+
+from setuptools import setup, Extension
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    sys.exit("setup.py only builds the optional Cython kernel and needs Cython: pip install cython")
+
+kernel = Extension(
+    "sim._kernel",
+    ["src/sim/_kernel.pyx"],
+    extra_compile_args=["-O3"],
+)
+
+setup(
+    name="aircraft-approach-sim-kernel",
+    package_dir={"": "src"},
+    ext_modules=cythonize([kernel], language_level=3),
+)
@@ -1,51 +1,55 @@
-import yaml
+import threading
+import time
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
-from sim.dynamics import PointMass3DOF
-from sim.guidance import ILSGuidance
-from sim.wind import WindModel
+from sim.factory import build_sim
 from sim.metrics import touchdown
 
-deg = np.pi / 180
+# Samples kept for the drawn trails (bounds memory and per-frame draw cost)
+TRAIL_LEN = 10000
+
+# Simulated seconds per wall-clock second (the sim thread paces itself to this)
+SIM_SPEED = 5.0
+
+
+class Trail:
+    """
+    Fixed-size ring buffer of the last `size` samples of a few channels.
+    Each sample is stored twice (slots i and i + size), so the window,
+    oldest first, is always one contiguous view: no copies per frame.
+    """
+
+    def __init__(self, size, channels):
+        self.size = size
+        self.buf = np.empty((channels, 2 * size))
+        self.head = 0   # next write slot
+        self.count = 0
+
+    def append(self, *values):
+        i = self.head
+        self.buf[:, i] = values
+        self.buf[:, i + self.size] = values
+        self.head = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def view(self):
+        end = self.head + self.size
+        return self.buf[:, end - self.count:end]
+
 
 def main():
-    with open("configs/baseline.yaml", "r") as f:
-        cfg = yaml.safe_load(f)
+    model, guidance, wind, cfg = build_sim("configs/baseline.yaml")
 
     dt = cfg["simulation"]["dt"]
     T = cfg["simulation"]["total_time"]
 
     approach = cfg["approach"]
-    aircraft_cfg = cfg["aircraft"]
-    limits = cfg["limits"]
-    refs = cfg["references"]
-    gains = cfg["guidance_gains"]
-
-    init = cfg["initial_state"]
-    state0 = {
-        "x": float(init["x"]),
-        "y": float(init["y"]),
-        "h": float(init["h"]),
-        "V": float(init["V"]),
-        "psi": float(init["psi_deg"]) * deg,
-        "gamma": float(init["gamma_deg"]) * deg,
-        "phi": float(init["phi_deg"]) * deg,
-        "throttle": float(init["throttle"]),
-        "n": float(init["n"]),
-    }
-
-    model = PointMass3DOF(state0, aircraft_cfg, limits)
-    guidance = ILSGuidance(gains, approach, limits, refs, aircraft_cfg)
-    wind = WindModel(**cfg["wind"])
-
-    # Logs for animation
-    xs, ys, hs, hrefs = [], [], [], []
-
-    # derivatives
-    y_prev = model.y
-    h_prev = model.h
+
+    # Logs for animation: x, y, h, href
+    trail = Trail(TRAIL_LEN, 4)
 
     # --- Figure layout ---
     fig = plt.figure(figsize=(11, 6))
@@ -71,47 +75,54 @@ def main():
     ax2.grid(True)
     ax2.legend()
 
-    # Axis ranges (initial)
-    ax1.set_xlim(model.x - 500, 200)
+    # Fixed axis ranges over the whole approach (x runs from start to just past threshold),
+    # so frames can be blitted without redrawing axes/ticks
+    x_range = (model.x - 500, approach["x_threshold"] + 200)
+    ax1.set_xlim(*x_range)
     ax1.set_ylim(-1500, 1500)
 
-    ax2.set_xlim(model.x - 500, 200)
-    ax2.set_ylim(0, max(model.h, guidance.h_ref(model.x)) + 200)
+    ax2.set_xlim(*x_range)
+    ax2.set_ylim(0, max(model.h, float(guidance.h_ref_vec(x_range).max())) + 200)
 
-    # Simulation control
+    # Simulation control: the sim runs in its own thread at a fixed wall-clock rate and
+    # publishes a copy of the trail after each step; frames draw the latest copy.
     t = 0.0
-    finished = {"done": False}
+    k = 0  # step index into the pregenerated wind
+    wind.pregenerate(dt, int(np.ceil(T / dt)))
+    done = threading.Event()
+    sim_state = {"snap": None}
 
-    def step_sim():
-        nonlocal t, y_prev, h_prev
+    # Touchdown window, computed once
+    x_thresh = approach["x_threshold"]
+    x_hi = x_thresh + approach.get("x_window", 2000.0)
 
-        y_dot = (model.y - y_prev) / dt
-        h_dot = (model.h - h_prev) / dt
-        y_prev, h_prev = model.y, model.h
+    def step_sim():
+        nonlocal t, k
 
-        phi_cmd, gamma_cmd, throttle_cmd, href = guidance.compute(
-            state={
-                "x": model.x, "y": model.y, "h": model.h, "V": model.V,
-                "psi": model.psi, "gamma": model.gamma, "phi": model.phi,
-                "throttle": model.throttle, "n": model.n
-            },
-            rates={"y_dot": y_dot, "h_dot": h_dot}
-        )
+        phi_cmd, gamma_cmd, throttle_cmd, href = guidance.compute(model.state_vec, model.y_dot, model.h_dot)
 
-        out = model.step(dt, phi_cmd, gamma_cmd, throttle_cmd, wind.sample(t))
+        model.step(dt, phi_cmd, gamma_cmd, throttle_cmd, wind.sample_step(k))
 
-        xs.append(out["x"])
-        ys.append(out["y"])
-        hs.append(out["h"])
-        hrefs.append(href)
+        trail.append(model.x, model.y, model.h, href)
 
         # stop conditions
-        if touchdown(model.x, model.h, x_thresh=approach["x_threshold"], h_thresh=approach["h_threshold"]):
-            finished["done"] = True
+        if touchdown(model.x, model.h, x_thresh, x_hi=x_hi):
+            done.set()
         if model.x > approach["x_threshold"] + 50.0:
-            finished["done"] = True
+            done.set()
 
         t += dt
+        k += 1
+
+    def sim_loop():
+        period = dt / SIM_SPEED
+        next_tick = time.perf_counter()
+        while not done.is_set() and t < T:
+            step_sim()
+            sim_state["snap"] = trail.view().copy()  # single reference swap: no lock needed
+
+            next_tick += period
+            done.wait(max(0.0, next_tick - time.perf_counter()))
 
     def init_anim():
         track_line.set_data([], [])
@@ -122,14 +133,9 @@ def main():
         return track_line, pos_dot, alt_line, ref_line, alt_dot
 
     def update(frame):
-        # run a few sim steps per frame for smoother motion
-        if not finished["done"] and t < T:
-            for _ in range(3):
-                step_sim()
-                if finished["done"]:
-                    break
-
-        if len(xs) > 1:
+        snap = sim_state["snap"]
+        if snap is not None and snap.shape[1] > 1:
+            xs, ys, hs, hrefs = snap
             track_line.set_data(xs, ys)
             pos_dot.set_data([xs[-1]], [ys[-1]])
 
@@ -137,19 +143,15 @@ def main():
             ref_line.set_data(xs, hrefs)
             alt_dot.set_data([xs[-1]], [hs[-1]])
 
-            # Keep view moving with aircraft (x is increasing toward 0)
-            xmin = xs[-1] - 2000
-            xmax = 200
-            ax1.set_xlim(xmin, xmax)
-            ax2.set_xlim(xmin, xmax)
-
-            # Auto y-limits altitude window
-            ax2.set_ylim(0, max(max(hs[-200:]), max(hrefs[-200:])) + 200)
-
         return track_line, pos_dot, alt_line, ref_line, alt_dot
 
-    anim = FuncAnimation(fig, update, init_func=init_anim, interval=30, blit=False)
+    sim_thread = threading.Thread(target=sim_loop, daemon=True)
+    fig.canvas.mpl_connect("close_event", lambda _event: done.set())
+
+    anim = FuncAnimation(fig, update, init_func=init_anim, interval=30, blit=True)
+    sim_thread.start()
     plt.show()
+    done.set()
 
 if __name__ == "__main__":
     main()
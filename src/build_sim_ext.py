@@ -0,0 +1,30 @@
+# Ahead-of-time build of the approach march with numba.pycc:
+#
+#     python src/build_sim_ext.py
+#
+# writes src/sim_ext.*.so (not tracked). With SIM_MARCH=aot, run_sim.simulate() then uses
+# sim_ext.run_march for float64 runs instead of JIT-compiling _march on first call.
+# It matches _march to ~1e-11 m on the baseline; with gusts the rounding differences grow
+# (mm on a stopped run, dm over long stop=False runs). Rebuild after changing any kernel in
+# sim/ or run_sim._march, then run tests/test_march_parity.py: a stale build is not detected.
+import os
+
+from numba.pycc import CC
+
+from run_sim import _march
+
+# (state, dyn_params, gd_params, Vwx, Vwy, dt, x_thresh, x_window, h_ground, stop, log) -> (n, end)
+MARCH_SIG = ("Tuple((i8, i8))(f8[:], UniTuple(f8, 15), UniTuple(f8, 9), f8[:], f8[:], "
+             "f8, f8, f8, f8, b1, f8[:, :])")
+
+
+def main():
+    cc = CC("sim_ext")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export("run_march", MARCH_SIG)(_march.py_func)
+    cc.compile()
+    print(f"Built sim_ext in {cc.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,78 +1,135 @@
-import yaml
+from math import cos, sin, degrees
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation, FFMpegWriter
 from matplotlib.patches import Rectangle, Circle, Polygon, FancyBboxPatch
+from matplotlib.collections import LineCollection
 
-from sim.dynamics import PointMass3DOF
-from sim.guidance import ILSGuidance
-from sim.wind import WindModel
+from sim.dynamics import STATE_KEYS
+from sim.factory import build_sim
 from sim.metrics import touchdown
-
-deg = np.pi / 180
+from run_sim import simulate, warm_up_march, LOG_COLS
 
 # -------------------------
 # OPTIONS
 # -------------------------
 SAVE_VIDEO = False  # True για export mp4
+PRECOMPUTE = True   # with SAVE_VIDEO: run the whole sim first, then render frames from the log
 VIDEO_PATH = "reports/figures/cockpit_sim.mp4"
 FPS = 30
 
-STEPS_PER_FRAME = 6
+# Sim time advanced per frame; the step count follows from the config's dt
+SIM_SECONDS_PER_FRAME = 0.3
 INTERVAL_MS = 20
 
 
 def clamp(x, a, b):
-    return float(np.clip(x, a, b))
+    return a if x < a else (b if x > b else x)
+
+
+class Blitter:
+    """
+    Manual blitting: the static part of the figure is cached once as a bitmap
+    (re-cached on every full redraw, e.g. resize), then each frame restores it
+    and draws only the animated artists on top, in (axes zorder, zorder) order.
+    An Axes can itself be animated (e.g. an inset): it is then redrawn whole, above
+    the artists of lower-zorder axes.
+    """
+
+    def __init__(self, canvas, artists):
+        self.canvas = canvas
+        self.artists = sorted(artists, key=lambda a: (a.axes.get_zorder() if a.axes else 0, a.get_zorder()))
+        for a in self.artists:
+            a.set_animated(True)
+        self.bg = None
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, _event):
+        self.bg = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        fig = self.canvas.figure
+        for a in self.artists:
+            fig.draw_artist(a)
+
+    def update(self):
+        if self.bg is None:
+            # first frame: full draw, _on_draw caches the background
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.bg)
+        self._draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
+        self.canvas.flush_events()
 
 
 # -------------------------
-# Instrument drawing helpers
+# Instrument helpers
+# build_*(ax) draws the static parts once and returns the artists that change;
+# update_*(handles, ...) only touches those and returns them (for blitting).
 # -------------------------
 def _bezel(ax):
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
     ax.axis("off")
     ax.add_patch(Circle((0.5, 0.5), 0.50, fill=True, facecolor="#111111", edgecolor="none", alpha=0.92))
     ax.add_patch(Circle((0.5, 0.5), 0.48, fill=False, lw=2, edgecolor="white", alpha=0.85))
 
 
-def draw_airspeed(ax, V):
-    kts = V * 1.94384
-    ax.clear()
+def _build_readout(ax, title, unit, fontsize):
     _bezel(ax)
-    ax.text(0.5, 0.86, "AIRSPEED", ha="center", va="center", fontsize=10, color="white")
-    ax.text(0.5, 0.55, f"{kts:5.0f}", ha="center", va="center", fontsize=22, family="monospace", color="white")
-    ax.text(0.5, 0.33, "kts", ha="center", va="center", fontsize=10, color="white")
+    ax.text(0.5, 0.86, title, ha="center", va="center", fontsize=10, color="white")
+    value = ax.text(0.5, 0.55, "", ha="center", va="center", fontsize=fontsize, family="monospace", color="white")
+    if unit:
+        ax.text(0.5, 0.33, unit, ha="center", va="center", fontsize=10, color="white")
+    return {"value": value}
+
+
+def build_airspeed(ax):
+    return _build_readout(ax, "AIRSPEED", "kts", 22)
+
+
+def update_airspeed(handles, V):
+    kts = V * 1.94384
+    handles["value"].set_text(f"{kts:5.0f}")
+    return (handles["value"],)
 
 
-def draw_altimeter(ax, h):
+def build_altimeter(ax):
+    return _build_readout(ax, "ALT", "ft", 22)
+
+
+def update_altimeter(handles, h):
     ft = h * 3.28084
-    ax.clear()
-    _bezel(ax)
-    ax.text(0.5, 0.86, "ALT", ha="center", va="center", fontsize=10, color="white")
-    ax.text(0.5, 0.55, f"{ft:6.0f}", ha="center", va="center", fontsize=22, family="monospace", color="white")
-    ax.text(0.5, 0.33, "ft", ha="center", va="center", fontsize=10, color="white")
+    handles["value"].set_text(f"{ft:6.0f}")
+    return (handles["value"],)
+
 
+def build_vspeed(ax):
+    return _build_readout(ax, "V/S", "fpm", 18)
 
-def draw_vspeed(ax, h_dot):
+
+def update_vspeed(handles, h_dot):
     fpm = h_dot * 196.8504
-    ax.clear()
-    _bezel(ax)
-    ax.text(0.5, 0.86, "V/S", ha="center", va="center", fontsize=10, color="white")
-    ax.text(0.5, 0.55, f"{fpm:6.0f}", ha="center", va="center", fontsize=18, family="monospace", color="white")
-    ax.text(0.5, 0.33, "fpm", ha="center", va="center", fontsize=10, color="white")
+    handles["value"].set_text(f"{fpm:6.0f}")
+    return (handles["value"],)
 
 
-def draw_hsi(ax, psi):
-    hdg = (np.rad2deg(psi) % 360.0)
-    ax.clear()
-    _bezel(ax)
-    ax.text(0.5, 0.86, "HDG", ha="center", va="center", fontsize=10, color="white")
-    ax.text(0.5, 0.55, f"{hdg:03.0f}°", ha="center", va="center", fontsize=20, family="monospace", color="white")
+def build_hsi(ax):
+    handles = _build_readout(ax, "HDG", None, 20)
     ax.plot([0.5, 0.5], [0.50, 0.88], lw=2, color="white")
+    return handles
 
 
-def draw_attitude(ax, gamma, phi):
-    ax.clear()
+def update_hsi(handles, psi):
+    hdg = (degrees(psi) % 360.0)
+    handles["value"].set_text(f"{hdg:03.0f}°")
+    return (handles["value"],)
+
+
+def build_attitude(ax):
     ax.set_xlim(-1, 1)
     ax.set_ylim(-1, 1)
     ax.axis("off")
@@ -80,22 +137,27 @@ def draw_attitude(ax, gamma, phi):
     ax.add_patch(Circle((0, 0), 1.00, fill=True, facecolor="#111111", edgecolor="none", alpha=0.92))
     ax.add_patch(Circle((0, 0), 0.98, fill=False, lw=2, edgecolor="white", alpha=0.85))
 
-    pitch = clamp(-np.rad2deg(gamma) / 12.0, -0.6, 0.6)
+    horizon, = ax.plot([], [], lw=2, color="white")
+
+    ax.plot([-0.25, 0.25], [0, 0], lw=3, color="white")
+    ax.plot([0, 0], [0, -0.15], lw=3, color="white")
+    return {"horizon": horizon}
+
+
+def update_attitude(handles, gamma, phi):
+    pitch = clamp(-degrees(gamma) / 12.0, -0.6, 0.6)
     roll = phi
-    c, s = np.cos(roll), np.sin(roll)
+    c, s = cos(roll), sin(roll)
 
     x1, y1 = -2.0, pitch
     x2, y2 =  2.0, pitch
     X1, Y1 = c*x1 - s*y1, s*x1 + c*y1
     X2, Y2 = c*x2 - s*y2, s*x2 + c*y2
-    ax.plot([X1, X2], [Y1, Y2], lw=2, color="white")
+    handles["horizon"].set_data([X1, X2], [Y1, Y2])
+    return (handles["horizon"],)
 
-    ax.plot([-0.25, 0.25], [0, 0], lw=3, color="white")
-    ax.plot([0, 0], [0, -0.15], lw=3, color="white")
 
-
-def draw_ils(ax, loc, gs):
-    ax.clear()
+def build_ils(ax):
     ax.set_xlim(-1, 1)
     ax.set_ylim(-1, 1)
     ax.axis("off")
@@ -106,48 +168,32 @@ def draw_ils(ax, loc, gs):
     ax.plot([-0.8, 0.8], [0, 0], lw=1, color="white")
     ax.plot([0, 0], [-0.8, 0.8], lw=1, color="white")
 
-    ax.plot([clamp(loc, -0.8, 0.8)], [0], marker="D", markersize=9, color="white")
-    ax.plot([0], [clamp(gs, -0.8, 0.8)], marker="D", markersize=9, color="white")
+    loc, = ax.plot([0], [0], marker="D", markersize=9, color="white")
+    gs, = ax.plot([0], [0], marker="D", markersize=9, color="white")
 
     ax.text(0, -0.95, "LOC ↔   GS ↕", ha="center", va="bottom", fontsize=8, color="white")
+    return {"loc": loc, "gs": gs}
+
+
+def update_ils(handles, loc, gs):
+    handles["loc"].set_data([clamp(loc, -0.8, 0.8)], [0])
+    handles["gs"].set_data([0], [clamp(gs, -0.8, 0.8)])
+    return handles["loc"], handles["gs"]
 
 
 # -------------------------
 # Main
 # -------------------------
 def main():
-    with open("configs/baseline.yaml", "r") as f:
-        cfg = yaml.safe_load(f)
+    model, guidance, wind, cfg = build_sim("configs/baseline.yaml")
 
     dt = cfg["simulation"]["dt"]
     T = cfg["simulation"]["total_time"]
+    steps_per_frame = max(1, round(SIM_SECONDS_PER_FRAME / dt))
 
     approach = cfg["approach"]
-    aircraft_cfg = cfg["aircraft"]
-    limits = cfg["limits"]
-    refs = cfg["references"]
-    gains = cfg["guidance_gains"]
-
-    init = cfg["initial_state"]
-    state0 = {
-        "x": float(init["x"]),
-        "y": float(init["y"]),
-        "h": float(init["h"]),
-        "V": float(init["V"]),
-        "psi": float(init["psi_deg"]) * deg,
-        "gamma": float(init["gamma_deg"]) * deg,
-        "phi": float(init["phi_deg"]) * deg,
-        "throttle": float(init["throttle"]),
-        "n": float(init["n"]),
-    }
-
-    model = PointMass3DOF(state0, aircraft_cfg, limits)
-    guidance = ILSGuidance(gains, approach, limits, refs, aircraft_cfg)
-    wind = WindModel(**cfg["wind"])
-
-    y_prev = model.y
-    h_prev = model.h
     t = 0.0
+    k = 0  # step index into the pregenerated wind (live paths)
     done = {"flag": False}
 
     fig = plt.figure(figsize=(13, 7))
@@ -179,11 +225,22 @@ def main():
     runway_left, = ax_view.plot([], [], lw=2)
     runway_right, = ax_view.plot([], [], lw=2)
     centerline, = ax_view.plot([0, 0], [0.0, 1.15], lw=1, linestyle="--")
-    center_dashes = [ax_view.plot([], [], lw=2, linestyle="--")[0] for _ in range(7)]
+
+    # centerline dashes: one collection, segments only move sideways with the runway
+    n_dashes = 7
+    y0, y1d = 0.10, 1.10
+    dash_ys = np.linspace(y0, y1d, n_dashes)
+    dash_lens = np.interp(dash_ys, [y0, y1d], [0.07, 0.015])
+    dash_segs = np.zeros((n_dashes, 2, 2))
+    dash_segs[:, 0, 1] = dash_ys
+    dash_segs[:, 1, 1] = np.minimum(dash_ys + dash_lens, 1.16)
+    center_dashes = LineCollection(dash_segs, linewidths=2, linestyles="--",
+                                   colors=[f"C{i % 10}" for i in range(4, 4 + n_dashes)])
+    ax_view.add_collection(center_dashes)
 
     # flight director (thinner)
-    fd_h, = ax_view.plot([-0.15, 0.15], [0.58, 0.58], lw=2.2)
-    fd_v, = ax_view.plot([0.0, 0.0], [0.43, 0.73], lw=2.2)
+    fd_h, = ax_view.plot([-0.15, 0.15], [0.58, 0.58], lw=2.2, color="C1")
+    fd_v, = ax_view.plot([0.0, 0.0], [0.43, 0.73], lw=2.2, color="C2")
 
     # PAPI (moved closer)
     papi_x = 0.45
@@ -204,9 +261,9 @@ def main():
     yoke_hub = Circle((0.0, -0.10), 0.05, fill=True, facecolor="#2a2a2a", edgecolor="black", lw=2, alpha=0.95)
     ax_view.add_patch(yoke_hub)
 
-    yoke_spoke1, = ax_view.plot([-0.10, -0.02], [-0.10, -0.10], lw=6)
-    yoke_spoke2, = ax_view.plot([0.02, 0.10], [-0.10, -0.10], lw=6)
-    yoke_spoke3, = ax_view.plot([0.0, 0.0], [-0.20, -0.06], lw=6)
+    yoke_spoke1, = ax_view.plot([-0.10, -0.02], [-0.10, -0.10], lw=6, color="C3")
+    yoke_spoke2, = ax_view.plot([0.02, 0.10], [-0.10, -0.10], lw=6, color="C4")
+    yoke_spoke3, = ax_view.plot([0.0, 0.0], [-0.20, -0.06], lw=6, color="C5")
 
     # info text in a translucent box
     info = ax_view.text(
@@ -224,108 +281,103 @@ def main():
     ax_hsi = ax_view.inset_axes([0.02, 0.73, 0.12, 0.24])
     ax_vs = ax_view.inset_axes([0.86, 0.73, 0.12, 0.24])
 
+    asi = build_airspeed(ax_asi)
+    att = build_attitude(ax_att)
+    ils = build_ils(ax_ils)
+    alt = build_altimeter(ax_alt)
+    vs = build_vspeed(ax_vs)
+    hsi = build_hsi(ax_hsi)
+
+    # runway corners at unit scale (near-left, near-right, far-right, far-left)
+    runway_shape = np.array([[-0.38, 0.05], [0.38, 0.05], [0.14, 1.12], [-0.14, 1.12]])
+
+    # horizon endpoints at zero pitch and the point they roll about
+    horizon_pts = np.array([[-2.0, 0.62], [2.0, 0.62]])
+    horizon_pivot = np.array([0.0, 0.62])
+
     # mapping
     def map_loc(y_m, x_m):
         dist = max(abs(x_m), 200.0)
-        full_scale = np.interp(dist, [200.0, 6000.0], [60.0, 250.0])
+        t = (min(dist, 6000.0) - 200.0) * (1.0 / 5800.0)
+        full_scale = 60.0 + 190.0 * t
         return clamp(-y_m / full_scale, -1.0, 1.0)
 
     def map_gs(h_err_m, x_m):
         dist = max(abs(x_m), 200.0)
-        full_scale = np.interp(dist, [200.0, 6000.0], [25.0, 120.0])
+        t = (min(dist, 6000.0) - 200.0) * (1.0 / 5800.0)
+        full_scale = 25.0 + 95.0 * t
         return clamp(h_err_m / full_scale, -1.0, 1.0)
 
     def runway_poly(y_m, x_m):
         dist = max(abs(x_m), 80.0)
-        scale = np.interp(dist, [80.0, 6500.0], [1.0, 0.16])
+        t = (min(dist, 6500.0) - 80.0) * (1.0 / 6420.0)
+        scale = 1.0 - 0.84 * t
         off = clamp(-y_m / dist, -0.9, 0.9) * 0.55
 
-        near_w = 0.38 * scale
-        far_w = 0.14 * scale
-        near_y = 0.05
-        far_y = 1.12
+        return runway_shape * (scale, 1.0) + (off, 0.0), off
 
-        p1 = [off - near_w, near_y]
-        p2 = [off + near_w, near_y]
-        p3 = [off + far_w, far_y]
-        p4 = [off - far_w, far_y]
-        return [p1, p2, p3, p4], off
+    # Every artist render() touches (instrument artists come from the build_* handles).
+    # The HSI / VS insets sit on top of ax_view, so they go last as whole axes (bezel
+    # included): the moving horizon must not be drawn over them.
+    animated = (horizon, runway_outline, runway_fill, runway_left, runway_right, centerline,
+                center_dashes, *papi, fd_h, fd_v, info,
+                *(a for handles in (asi, att, ils, alt) for a in handles.values()),
+                ax_hsi, ax_vs)
+
+    # Touchdown window, computed once
+    x_thresh = approach["x_threshold"]
+    x_hi = x_thresh + approach.get("x_window", 2000.0)
 
     def step_sim():
-        nonlocal t, y_prev, h_prev
-
-        y_dot = (model.y - y_prev) / dt
-        h_dot = (model.h - h_prev) / dt
-        y_prev, h_prev = model.y, model.h
-
-        phi_cmd, gamma_cmd, throttle_cmd, href = guidance.compute(
-            state={
-                "x": model.x, "y": model.y, "h": model.h, "V": model.V,
-                "psi": model.psi, "gamma": model.gamma, "phi": model.phi,
-                "throttle": model.throttle, "n": model.n
-            },
-            rates={"y_dot": y_dot, "h_dot": h_dot}
-        )
+        nonlocal t, k
 
-        model.step(dt, phi_cmd, gamma_cmd, throttle_cmd, wind.sample(t))
+        phi_cmd, gamma_cmd, throttle_cmd, href = guidance.compute(model.state_vec, model.y_dot, model.h_dot)
 
-        if touchdown(model.x, model.h, approach["x_threshold"], approach["h_threshold"]):
+        model.step(dt, phi_cmd, gamma_cmd, throttle_cmd, wind.sample_step(k))
+
+        if touchdown(model.x, model.h, x_thresh, x_hi=x_hi):
             done["flag"] = True
         if model.x > approach["x_threshold"] + 80.0:
             done["flag"] = True
 
         t += dt
-        return y_dot, h_dot, href
+        k += 1
+        return href
 
-    def update(_frame):
-        if not done["flag"] and t < T:
-            for _ in range(STEPS_PER_FRAME):
-                y_dot, h_dot, href = step_sim()
-                if done["flag"]:
-                    break
-        else:
-            y_dot, h_dot, href = 0.0, 0.0, guidance.h_ref(model.x)
+    def render(st, href, h_dot, t_now, Vwx, Vwy):
+        """
+        Draw one frame from a flat state vector (layout STATE_KEYS).
+        """
+        x, y, h, V, psi, gamma, phi, throttle, n = st
 
-        h_err = href - model.h
-        loc = map_loc(model.y, model.x)
-        gs_dev = map_gs(h_err, model.x)
+        h_err = href - h
+        loc = map_loc(y, x)
+        gs_dev = map_gs(h_err, x)
 
         # horizon rotation
-        pitch = clamp(-np.rad2deg(model.gamma) / 14.0, -0.45, 0.45)
-        roll = model.phi
-        c, s = np.cos(roll), np.sin(roll)
-
-        x1, y1h = -2.0, 0.62 + pitch
-        x2, y2h =  2.0, 0.62 + pitch
+        pitch = clamp(-degrees(gamma) / 14.0, -0.45, 0.45)
+        roll = phi
+        c, s = cos(roll), sin(roll)
+        R = np.array([[c, -s], [s, c]])
 
-        def rot_about(x, y, cx=0.0, cy=0.62):
-            xr, yr = x - cx, y - cy
-            X = c*xr - s*yr + cx
-            Y = s*xr + c*yr + cy
-            return X, Y
-
-        X1, Y1 = rot_about(x1, y1h)
-        X2, Y2 = rot_about(x2, y2h)
-        horizon.set_data([X1, X2], [Y1, Y2])
+        ends = (horizon_pts + (0.0, pitch) - horizon_pivot) @ R.T + horizon_pivot
+        horizon.set_data(ends[:, 0], ends[:, 1])
 
         # runway visuals
-        pts, off = runway_poly(model.y, model.x)
+        pts, off = runway_poly(y, x)
         runway_outline.set_xy(pts)
         runway_fill.set_xy(pts)
 
-        runway_left.set_data([pts[0][0], pts[3][0]], [pts[0][1], pts[3][1]])
-        runway_right.set_data([pts[1][0], pts[2][0]], [pts[1][1], pts[2][1]])
+        runway_left.set_data(pts[[0, 3], 0], pts[[0, 3], 1])
+        runway_right.set_data(pts[[1, 2], 0], pts[[1, 2], 1])
 
         centerline.set_data([off, off], [0.0, 1.15])
-        y0, y1d = 0.10, 1.10
-        dash_positions = np.linspace(y0, y1d, len(center_dashes))
-        for i, yp in enumerate(dash_positions):
-            dash_len = np.interp(yp, [y0, y1d], [0.07, 0.015])
-            center_dashes[i].set_data([off, off], [yp, min(yp + dash_len, 1.16)])
+        dash_segs[:, :, 0] = off
+        center_dashes.set_segments(dash_segs)
 
         # PAPI from glideslope deviation: above slope -> more red
         dev = clamp(-h_err / 80.0, -3.0, 3.0)
-        reds = int(np.clip(2 + np.round(dev), 0, 4))
+        reds = int(clamp(2 + round(dev), 0, 4))
         for i in range(4):
             if i < reds:
                 papi[i].set_facecolor("#cc0000")
@@ -335,30 +387,80 @@ def main():
                 papi[i].set_edgecolor("#999999")
 
         # instruments
-        draw_airspeed(ax_asi, model.V)
-        draw_attitude(ax_att, model.gamma, model.phi)
-        draw_ils(ax_ils, loc, gs_dev)
-        draw_altimeter(ax_alt, model.h)
-        draw_vspeed(ax_vs, h_dot)
-        draw_hsi(ax_hsi, model.psi)
-
-        Vwx, Vwy = wind.sample(t)
+        update_airspeed(asi, V)
+        update_attitude(att, gamma, phi)
+        update_ils(ils, loc, gs_dev)
+        update_altimeter(alt, h)
+        update_vspeed(vs, h_dot)
+        update_hsi(hsi, psi)
+
         info.set_text(
-            f"t={t:6.1f}s   x={model.x:8.1f}m   y={model.y:7.1f}m   h={model.h:7.1f}m\n"
-            f"V={model.V:6.1f}m/s   phi={np.rad2deg(model.phi):6.1f}deg   gamma={np.rad2deg(model.gamma):6.1f}deg\n"
-            f"h_ref={href:7.1f}m   h_err={h_err:7.1f}m   throttle={model.throttle:5.2f}   n={model.n:4.2f}\n"
+            f"t={t_now:6.1f}s   x={x:8.1f}m   y={y:7.1f}m   h={h:7.1f}m\n"
+            f"V={V:6.1f}m/s   phi={degrees(phi):6.1f}deg   gamma={degrees(gamma):6.1f}deg\n"
+            f"h_ref={href:7.1f}m   h_err={h_err:7.1f}m   throttle={throttle:5.2f}   n={n:4.2f}\n"
             f"wind: Vwx={Vwx:5.1f}  Vwy={Vwy:5.1f}   PAPI reds={reds}/4"
         )
 
-        return (horizon, runway_outline, runway_fill, runway_left, runway_right, centerline, fd_h, fd_v, info)
+        return animated
+
+    def update(_frame):
+        if not done["flag"] and t < T:
+            for _ in range(steps_per_frame):
+                href = step_sim()
+                if done["flag"]:
+                    break
+            h_dot = model.h_dot
+        else:
+            h_dot, href = 0.0, guidance.h_ref(model.x)
+
+        Vwx, Vwy = wind.sample_step(k)
+        return render(model.state_vec, href, h_dot, t, Vwx, Vwy)
+
+    if SAVE_VIDEO and PRECOMPUTE:
+        # Simulate first (same jitted loop as run_sim.py, same stop rules as step_sim),
+        # then stream every steps_per_frame-th logged state to the writer.
+        warm_up_march(model, guidance)
+        ts, log, Vwx, Vwy, _ = simulate(model, guidance, wind, dt, T,
+                                        approach["x_threshold"], 80.0, 1.0)
+        states = log[:, :len(STATE_KEYS)]
+        hrefs = log[:, LOG_COLS["href"]]
+        h_dots = log[:, LOG_COLS["h_dot"]]
 
-    anim = FuncAnimation(fig, update, interval=INTERVAL_MS, blit=False)
+        writer = FFMpegWriter(fps=FPS, bitrate=2400)
+        print(f"Saving video to: {VIDEO_PATH}")
+        with writer.saving(fig, VIDEO_PATH, dpi=100):
+            for i in range(0, len(ts), steps_per_frame):
+                # Row i is the state after step i; like the live path, show the wind for
+                # the next step (the last row has none logged: repeat its own)
+                j = min(i + 1, len(ts) - 1)
+                render(states[i], hrefs[i], h_dots[i], ts[i] + dt, Vwx[j], Vwy[j])
+                writer.grab_frame()
+        print("Done.")
+        return
+
+    # Live / FuncAnimation paths step the sim themselves: draw their wind up front
+    wind.pregenerate(dt, int(np.ceil(T / dt)))
 
     if SAVE_VIDEO:
+        anim = FuncAnimation(fig, update, interval=INTERVAL_MS, blit=True)
         writer = FFMpegWriter(fps=FPS, bitrate=2400)
         print(f"Saving video to: {VIDEO_PATH}")
         anim.save(VIDEO_PATH, writer=writer)
         print("Done.")
+        return
+
+    # Live view: only the animated artists are redrawn per tick.
+    # First frame is the initial state; the sim only steps from the first tick on.
+    render(model.state_vec, guidance.h_ref(model.x), model.h_dot, t, *wind.sample_step(k))
+    blitter = Blitter(fig.canvas, animated)
+
+    def tick():
+        update(None)
+        blitter.update()
+
+    timer = fig.canvas.new_timer(interval=INTERVAL_MS)
+    timer.add_callback(tick)
+    timer.start()
 
     plt.show()
 
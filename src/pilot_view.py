@@ -1,53 +1,28 @@
-import yaml
+from math import degrees
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
-from sim.dynamics import PointMass3DOF
-from sim.guidance import ILSGuidance
-from sim.wind import WindModel
+from sim.factory import build_sim
 from sim.metrics import touchdown
 
-deg = np.pi / 180
+# Sim time advanced per animation frame; the step count follows from the config's dt
+SIM_SECONDS_PER_FRAME = 0.2
 
 
 def clamp(x, a, b):
-    return float(np.clip(x, a, b))
+    return a if x < a else (b if x > b else x)
 
 
 def main():
-    with open("configs/baseline.yaml", "r") as f:
-        cfg = yaml.safe_load(f)
+    model, guidance, wind, cfg = build_sim("configs/baseline.yaml")
 
     dt = cfg["simulation"]["dt"]
     T = cfg["simulation"]["total_time"]
+    steps_per_frame = max(1, round(SIM_SECONDS_PER_FRAME / dt))
 
     approach = cfg["approach"]
-    aircraft_cfg = cfg["aircraft"]
-    limits = cfg["limits"]
-    refs = cfg["references"]
-    gains = cfg["guidance_gains"]
-
-    init = cfg["initial_state"]
-    state0 = {
-        "x": float(init["x"]),
-        "y": float(init["y"]),
-        "h": float(init["h"]),
-        "V": float(init["V"]),
-        "psi": float(init["psi_deg"]) * deg,
-        "gamma": float(init["gamma_deg"]) * deg,
-        "phi": float(init["phi_deg"]) * deg,
-        "throttle": float(init["throttle"]),
-        "n": float(init["n"]),
-    }
-
-    model = PointMass3DOF(state0, aircraft_cfg, limits)
-    guidance = ILSGuidance(gains, approach, limits, refs, aircraft_cfg)
-    wind = WindModel(**cfg["wind"])
-
-    # For numerical derivatives
-    y_prev = model.y
-    h_prev = model.h
 
     # --- HUD figure ---
     fig = plt.figure(figsize=(10, 6))
@@ -90,6 +65,8 @@ def main():
     info = ax.text(-1.15, 0.95, "", ha="left", va="top", family="monospace")
 
     t = 0.0
+    k = 0  # step index into the pregenerated wind
+    wind.pregenerate(dt, int(np.ceil(T / dt)))
     done = {"flag": False}
 
     def hud_map_localizer(y_m, x_m):
@@ -98,8 +75,9 @@ def main():
         Scale increases near runway (more sensitive).
         """
         dist = max(abs(x_m), 200.0)
-        # normalize: 1 "full-scale" ~ 250 m far, ~ 60 m near
-        full_scale = np.interp(dist, [200.0, 6000.0], [60.0, 250.0])
+        # normalize: 1 "full-scale" ~ 250 m far, ~ 60 m near (linear in between)
+        t = (min(dist, 6000.0) - 200.0) * (1.0 / 5800.0)
+        full_scale = 60.0 + 190.0 * t
         return clamp(-y_m / full_scale, -0.9, 0.9)
 
     def hud_map_glideslope(h_err_m, x_m):
@@ -108,7 +86,8 @@ def main():
         More sensitive near runway.
         """
         dist = max(abs(x_m), 200.0)
-        full_scale = np.interp(dist, [200.0, 6000.0], [25.0, 120.0])
+        t = (min(dist, 6000.0) - 200.0) * (1.0 / 5800.0)
+        full_scale = 25.0 + 95.0 * t
         return clamp(h_err_m / full_scale, -0.8, 0.8)
 
     def runway_shape(y_m, x_m):
@@ -118,8 +97,9 @@ def main():
         - lateral shift depends on y/x (like looking left/right)
         """
         dist = max(abs(x_m), 80.0)
-        # Perspective scale (closer -> bigger)
-        s = np.interp(dist, [80.0, 6000.0], [0.9, 0.15])
+        # Perspective scale (closer -> bigger), linear from 0.9 at 80 m to 0.15 at 6 km
+        t = (min(dist, 6000.0) - 80.0) * (1.0 / 5920.0)
+        s = 0.9 - 0.75 * t
         # Lateral visual offset (angle approx)
         off = clamp(-y_m / dist, -0.8, 0.8) * 0.6
 
@@ -135,37 +115,31 @@ def main():
         p4 = [off - far_w, far_y]
         return [p1, p2, p3, p4], off
 
+    # Touchdown window, computed once
+    x_thresh = approach["x_threshold"]
+    x_hi = x_thresh + approach.get("x_window", 2000.0)
+
     def step_sim():
-        nonlocal t, y_prev, h_prev
-
-        y_dot = (model.y - y_prev) / dt
-        h_dot = (model.h - h_prev) / dt
-        y_prev, h_prev = model.y, model.h
-
-        phi_cmd, gamma_cmd, throttle_cmd, href = guidance.compute(
-            state={
-                "x": model.x, "y": model.y, "h": model.h, "V": model.V,
-                "psi": model.psi, "gamma": model.gamma, "phi": model.phi,
-                "throttle": model.throttle, "n": model.n
-            },
-            rates={"y_dot": y_dot, "h_dot": h_dot}
-        )
+        nonlocal t, k
+
+        phi_cmd, gamma_cmd, throttle_cmd, href = guidance.compute(model.state_vec, model.y_dot, model.h_dot)
 
-        wxy = wind.sample(t)
+        wxy = wind.sample_step(k)
         model.step(dt, phi_cmd, gamma_cmd, throttle_cmd, wxy)
 
         # stop conditions
-        if touchdown(model.x, model.h, x_thresh=approach["x_threshold"], h_thresh=approach["h_threshold"]):
+        if touchdown(model.x, model.h, x_thresh, x_hi=x_hi):
             done["flag"] = True
         if model.x > approach["x_threshold"] + 80.0:
             done["flag"] = True
 
         t += dt
+        k += 1
 
     def update(_frame):
         # run a few steps per frame
         if not done["flag"] and t < T:
-            for _ in range(4):
+            for _ in range(steps_per_frame):
                 step_sim()
                 if done["flag"]:
                     break
@@ -187,15 +161,15 @@ def main():
         runway_centerline.set_data([off, off], [-0.05, 0.65])
 
         # Horizon (gamma proxy): when descending (negative gamma) horizon goes up a bit
-        horizon_y = clamp(-np.rad2deg(model.gamma) / 12.0, -0.6, 0.6)
+        horizon_y = clamp(-degrees(model.gamma) / 12.0, -0.6, 0.6)
         horizon.set_data([-1.2, 1.2], [horizon_y, horizon_y])
 
         # Text
-        Vwx, Vwy = wind.sample(t)
+        Vwx, Vwy = wind.sample_step(k)
         info.set_text(
             f"t={t:6.1f} s\n"
             f"x={model.x:8.1f} m  y={model.y:7.1f} m  h={model.h:7.1f} m\n"
-            f"V={model.V:6.1f} m/s  phi={np.rad2deg(model.phi):6.1f} deg  gamma={np.rad2deg(model.gamma):6.1f} deg\n"
+            f"V={model.V:6.1f} m/s  phi={degrees(model.phi):6.1f} deg  gamma={degrees(model.gamma):6.1f} deg\n"
             f"h_ref={href:7.1f} m  h_err={h_err:7.1f} m\n"
             f"throttle={model.throttle:4.2f}  n={model.n:4.2f}\n"
             f"wind: Vwx={Vwx:5.1f}  Vwy={Vwy:5.1f}"
@@ -1,46 +1,63 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
-def plot_results(log):
-    x = np.array(log["x"])
-    y = np.array(log["y"])
-    h = np.array(log["h"])
-    href = np.array(log["href"])
-    V = np.array(log["V"])
-    phi = np.array(log["phi"])
-    gamma = np.array(log["gamma"])
-    thr = np.array(log["throttle"])
-
-    plt.figure()
-    plt.plot(x, y)
-    plt.axhline(0, linestyle="--")
-    plt.gca().invert_xaxis()
-    plt.xlabel("x (m) -> threshold")
-    plt.ylabel("y (m)")
-    plt.title("Ground track (Localizer)")
-    plt.grid(True)
-
-    plt.figure()
-    plt.plot(x, h, label="h")
-    plt.plot(x, href, "--", label="h_ref")
-    plt.gca().invert_xaxis()
-    plt.xlabel("x (m)")
-    plt.ylabel("h (m)")
-    plt.title("Glideslope tracking")
-    plt.legend()
-    plt.grid(True)
-
-    plt.figure()
-    plt.plot(V)
-    plt.title("Speed V (m/s)")
-    plt.grid(True)
-
-    plt.figure()
-    plt.plot(np.rad2deg(phi), label="phi (deg)")
-    plt.plot(np.rad2deg(gamma), label="gamma (deg)")
-    plt.plot(thr, label="throttle")
-    plt.title("Controls / states")
-    plt.legend()
-    plt.grid(True)
+# Longest trace drawn as-is; longer ones are decimated (visually identical, draw time ~ points)
+MAX_PLOT_POINTS = 5000
 
+
+def _decimate(*arrays):
+    n = len(arrays[0])
+    if n <= MAX_PLOT_POINTS:
+        return arrays
+    step = n // MAX_PLOT_POINTS
+    return tuple(a[::step] for a in arrays)
+
+
+def plot_results(log, cols):
+    """
+    log: (N, n_channels) array, one row per step; cols maps channel name -> column.
+    """
+    x = log[:, cols["x"]]
+    y = log[:, cols["y"]]
+    h = log[:, cols["h"]]
+    href = log[:, cols["href"]]
+    V = log[:, cols["V"]]
+    phi = log[:, cols["phi"]]
+    gamma = log[:, cols["gamma"]]
+    thr = log[:, cols["throttle"]]
+
+    k = np.arange(len(x))
+    x, y, h, href, V, phi, gamma, thr, k = _decimate(x, y, h, href, V, phi, gamma, thr, k)
+
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 8))
+
+    ax1.plot(x, y, rasterized=True)
+    ax1.axhline(0, linestyle="--")
+    ax1.invert_xaxis()
+    ax1.set_xlabel("x (m) -> threshold")
+    ax1.set_ylabel("y (m)")
+    ax1.set_title("Ground track (Localizer)")
+    ax1.grid(True)
+
+    ax2.plot(x, h, label="h", rasterized=True)
+    ax2.plot(x, href, "--", label="h_ref", rasterized=True)
+    ax2.invert_xaxis()
+    ax2.set_xlabel("x (m)")
+    ax2.set_ylabel("h (m)")
+    ax2.set_title("Glideslope tracking")
+    ax2.legend()
+    ax2.grid(True)
+
+    ax3.plot(k, V, rasterized=True)
+    ax3.set_title("Speed V (m/s)")
+    ax3.grid(True)
+
+    ax4.plot(k, np.rad2deg(phi), label="phi (deg)", rasterized=True)
+    ax4.plot(k, np.rad2deg(gamma), label="gamma (deg)", rasterized=True)
+    ax4.plot(k, thr, label="throttle", rasterized=True)
+    ax4.set_title("Controls / states")
+    ax4.legend()
+    ax4.grid(True)
+
+    fig.tight_layout()
     plt.show()
@@ -1,52 +1,299 @@
-import yaml
+import multiprocessing
+import os
+
 import numpy as np
 
-from sim.dynamics import PointMass3DOF
-from sim.guidance import ILSGuidance
-from sim.wind import WindModel
+from sim.jit import njit, prange
+from sim.dynamics import step_state, still_air_rates, STATE_KEYS, IX_X, IX_H
+from sim.guidance import guidance_compute
+from sim.factory import build_sim, build_from_config
 from sim.metrics import touchdown, rmse, stabilized_gate
+from sim.wind import WindModel
 from plots import plot_results
 
-deg = np.pi / 180
+# Compiled builds of _march are opt-in (float64 only): they are separate builds of the
+# same kernels, so they agree with _march only to rounding (which gusty runs amplify to
+# mm..dm over a long march), and a build older than the kernels is not detected on import.
+# tests/test_march_parity.py checks them against _march.
+#   SIM_MARCH=aot     sim_ext.run_march, built by build_sim_ext.py
+#   SIM_MARCH=cython  sim._kernel.run_march (Cython port), built by setup.py
+MARCH_BACKEND = os.environ.get("SIM_MARCH", "jit")
+if MARCH_BACKEND not in ("jit", "aot", "cython"):
+    raise ValueError(f"SIM_MARCH must be 'jit', 'aot' or 'cython', got {MARCH_BACKEND!r}")
+if MARCH_BACKEND == "aot":
+    from sim_ext import run_march as _march_aot
+elif MARCH_BACKEND == "cython":
+    from sim._kernel import run_march as _march_aot
+else:
+    _march_aot = None
 
+# Logged per step: the state, the h_dot step_state returned (guidance's rate input) and href
+LOG_KEYS = STATE_KEYS + ("h_dot", "href")
+LOG_COLS = {k: j for j, k in enumerate(LOG_KEYS)}
 
-def main():
-    with open("configs/baseline.yaml", "r") as f:
-        cfg = yaml.safe_load(f)
+# March end reasons
+END_TIME, END_TOUCHDOWN, END_MISSED = 0, 1, 2
+
+
+@njit(cache=True)
+def _march(state, dyn_params, gd_params, Vwx, Vwy, dt, x_thresh, x_window, h_ground, stop, log):
+    """
+    Run guidance + dynamics for up to len(log) steps, writing the state after each step
+    into log[i, :len(state)] and that step's h_dot into log[i, len(state)]; the href
+    column is left to the caller (see fill_href).
+    Returns (rows written, end reason).
+    With stop=False all steps are integrated and the end checks are skipped.
+    """
+    y_dot, h_dot = still_air_rates(state)
+    ns = state.shape[0]
+
+    for i in range(log.shape[0]):
+        phi_cmd, gamma_cmd, throttle_cmd, _ = guidance_compute(state, y_dot, h_dot, gd_params)
+        y_dot, h_dot = step_state(state, dyn_params, dt, phi_cmd, gamma_cmd, throttle_cmd, Vwx[i], Vwy[i])
+
+        log[i, :ns] = state
+        log[i, ns] = h_dot
+
+        if not stop:
+            continue
+        x = state[IX_X]
+        if x >= x_thresh and x <= x_thresh + x_window and state[IX_H] <= h_ground:
+            return i + 1, END_TOUCHDOWN
+        # Missed approach if we exit runway window without touchdown
+        if x > x_thresh + x_window:
+            return i + 1, END_MISSED
+
+    return log.shape[0], END_TIME
+
+
+@njit(cache=True, parallel=True)
+def _march_batch(states, dyn_params, gd_params, Vwx, Vwy, dt, x_thresh, x_window, h_ground, logs):
+    """
+    _march (with end checks) for K independent runs, one per row of states / Vwx / Vwy,
+    spread over threads with prange. logs is (K, N, len(LOG_KEYS)).
+    Returns (rows written, end reason) per run.
+    """
+    K = states.shape[0]
+    n = np.empty(K, dtype=np.int64)
+    end = np.empty(K, dtype=np.int64)
+    for k in prange(K):
+        n[k], end[k] = _march(states[k], dyn_params, gd_params, Vwx[k], Vwy[k], dt,
+                              x_thresh, x_window, h_ground, True, logs[k])
+    return n, end
+
+
+def warm_up_march(model, guidance):
+    """
+    Compile (or load from the numba cache) _march now, on a scratch copy of the state and
+    a 1-row log, so the first simulate() call does not pay for it
+    (sim.factory.warm_up only covers the per-step kernels).
+    """
+    log = np.empty((1, len(LOG_KEYS)))
+    w = np.zeros(1)
+    _march(model.state_vector(), model.params, guidance.params, w, w, 0.01, 0.0, 0.0, 0.0, True, log)
 
-    dt = cfg["simulation"]["dt"]
-    T = cfg["simulation"]["total_time"]
 
+def warm_up_march_batch(model, guidance):
+    """
+    Same for the parallel _march_batch behind run_monte_carlo(), the slowest kernel to
+    compile; only worth calling ahead of Monte-Carlo runs (otherwise the first
+    run_monte_carlo() call compiles it).
+    """
+    log = np.empty((1, 1, len(LOG_KEYS)))
+    w = np.zeros((1, 1))
+    _march_batch(model.state_vector()[None, :], model.params, guidance.params, w, w,
+                 0.01, 0.0, 0.0, 0.0, log)
+
+
+def end_time(n, dt, end):
+    """
+    Sim time reported after an n-step march: the last step's start time when it ended on
+    touchdown / missed approach (the end checks run before t advances), else n * dt.
+    """
+    return (n - 1) * dt if end != END_TIME else n * dt
+
+
+def fill_href(log, guidance, x0):
+    """
+    Fill the href column of a (n, len(LOG_KEYS)) log in one vector op with the reference
+    height guidance used on each step, i.e. at the position before that step
+    (x0, the march's start, then the previous row's x).
+    """
+    x = log[:, LOG_COLS["x"]]
+    x_pre = np.concatenate(([x0], x[:-1]))[:len(x)]
+    log[:, LOG_COLS["href"]] = guidance.h_ref_vec(x_pre)
+    return log
+
+
+def simulate(model, guidance, wind, dt, T, x_thresh, x_window, h_ground, stop=True, dtype=np.float64):
+    """
+    Run the jitted march from the model's current state for up to T seconds.
+    Stops on touchdown in [x_thresh, x_thresh + x_window] or when passing that window
+    (unless stop=False). Returns (ts, log, Vwx, Vwy, end) truncated to the steps actually run.
+    dtype sets the state / wind / log arrays (float32 halves their footprint; numba
+    compiles a separate specialization for it).
+    """
+    N = int(np.ceil(T / dt))
+    ts = np.arange(N) * dt
+    Vwx, Vwy = (w.astype(dtype) for w in wind.sample_series(ts))
+
+    state = model.state_vector().astype(dtype)
+    log = np.empty((N, len(LOG_KEYS)), dtype=dtype)
+
+    x0 = float(state[IX_X])
+    march = _march_aot if _march_aot is not None and log.dtype == np.float64 else _march
+    n, end = march(state, model.params, guidance.params, Vwx, Vwy, float(dt),
+                   float(x_thresh), float(x_window), float(h_ground), bool(stop), log)
+    return ts[:n], fill_href(log[:n], guidance, x0), Vwx[:n], Vwy[:n], end
+
+
+def state_dtype(cfg):
+    """
+    Array dtype of the march from cfg["simulation"]["dtype"] (default float64).
+    """
+    return np.dtype(cfg["simulation"].get("dtype", "float64"))
+
+
+def run_sim(cfg):
+    """
+    Batch/sweep variant: integrate the full total_time with no end checks in the loop,
+    then cut the log at the first touchdown / runway-window exit with a vectorized scan.
+    Returns the (n, len(LOG_KEYS)) log array.
+    """
+    model, guidance, wind = build_from_config(cfg)
+    approach = cfg["approach"]
+
+    x_thresh = float(approach["x_threshold"])
+    x_window = float(approach.get("x_window", 2000.0))
+    h_ground = float(approach.get("h_ground", 1.0))
+
+    _, log, _, _, _ = simulate(model, guidance, wind, cfg["simulation"]["dt"], cfg["simulation"]["total_time"],
+                               x_thresh, x_window, h_ground, stop=False, dtype=state_dtype(cfg))
+
+    x, h = log[:, LOG_COLS["x"]], log[:, LOG_COLS["h"]]
+    x_hi = x_thresh + x_window
+    ended = ((x >= x_thresh) & (x <= x_hi) & (h <= h_ground)) | (x > x_hi)
+    if ended.any():
+        log = log[:int(np.argmax(ended)) + 1]
+    return log
+
+
+def run_monte_carlo(cfg, seeds, states0=None):
+    """
+    Runs of one config that differ only by wind seed (and optionally initial state,
+    one flat IX_* vector per run), marched in parallel threads inside numba.
+    Each run draws the same wind as a serial run with that seed.
+    Returns (logs, n, end): logs[k, :n[k]] is run k's log, end[k] its end reason.
+    """
+    model, guidance, _ = build_from_config(cfg)
+    approach = cfg["approach"]
+    dt = float(cfg["simulation"]["dt"])
+    N = int(np.ceil(cfg["simulation"]["total_time"] / dt))
+    ts = np.arange(N) * dt
+
+    K = len(seeds)
+    Vwx = np.empty((K, N))
+    Vwy = np.empty((K, N))
+    for k, seed in enumerate(seeds):
+        wind = WindModel(**{**cfg["wind"], "seed": seed})
+        Vwx[k], Vwy[k] = wind.sample_series(ts)
+
+    if states0 is None:
+        states = np.tile(model.state_vector(), (K, 1))
+    else:
+        states = np.array(states0, dtype=np.float64).reshape(K, len(STATE_KEYS))
+
+    x0 = states[:, IX_X].copy()
+    logs = np.empty((K, N, len(LOG_KEYS)))
+    n, end = _march_batch(states, model.params, guidance.params, Vwx, Vwy, dt,
+                          float(approach["x_threshold"]), float(approach.get("x_window", 2000.0)),
+                          float(approach.get("h_ground", 1.0)), logs)
+    for k in range(K):
+        fill_href(logs[k, :n[k]], guidance, x0[k])
+    return logs, n, end
+
+
+def pool_map(fn, items, n_workers=None):
+    """
+    fn over items in a process pool (n_workers=None -> cpu_count), results in input order.
+    """
+    with multiprocessing.Pool(n_workers) as pool:
+        return pool.map(fn, items)
+
+
+def run_batch(cfg_list, n_workers=None):
+    """
+    run_sim over a list of config dicts, one process per core (see pool_map).
+    """
+    return pool_map(run_sim, cfg_list, n_workers)
+
+
+def summarize(log, cfg):
+    """
+    Scalar metrics of one run from its log array.
+    """
     approach = cfg["approach"]
-    aircraft_cfg = cfg["aircraft"]
-    limits = cfg["limits"]
     refs = cfg["references"]
-    gains = cfg["guidance_gains"]
-
-    init = cfg["initial_state"]
-    state0 = {
-        "x": float(init["x"]),
-        "y": float(init["y"]),
-        "h": float(init["h"]),
-        "V": float(init["V"]),
-        "psi": float(init["psi_deg"]) * deg,
-        "gamma": float(init["gamma_deg"]) * deg,
-        "phi": float(init["phi_deg"]) * deg,
-        "throttle": float(init["throttle"]),
-        "n": float(init["n"]),
+    x_thresh = float(approach["x_threshold"])
+    x_window = float(approach.get("x_window", 2000.0))
+    h_ground = float(approach.get("h_ground", 1.0))
+
+    # Metrics in float64 whatever the march dtype
+    log = log.astype(np.float64, copy=False)
+    xs, ys, hs = log[:, LOG_COLS["x"]], log[:, LOG_COLS["y"]], log[:, LOG_COLS["h"]]
+    x_end, h_end = float(xs[-1]), float(hs[-1])
+
+    touched = bool(touchdown(x_end, h_end, x_thresh=x_thresh, x_window=x_window, h_ground=h_ground))
+    if touched:
+        end = END_TOUCHDOWN
+    elif x_end > x_thresh + x_window:
+        end = END_MISSED
+    else:
+        end = END_TIME
+
+    # Stabilized approach gate (every logged step)
+    stable = all(
+        stabilized_gate(y_err, refs["V_ref"] - V, gamma, h)
+        for y_err, V, gamma, h in zip(ys, log[:, LOG_COLS["V"]], log[:, LOG_COLS["gamma"]], hs)
+    )
+
+    return {
+        "t_end": end_time(len(log), cfg["simulation"]["dt"], end),
+        "x_end": x_end,
+        "h_end": h_end,
+        "touchdown": touched,
+        "y_rmse": rmse(ys),
+        "h_rmse": rmse(log[:, LOG_COLS["href"]] - hs),
+        "stable": stable,
     }
 
-    model = PointMass3DOF(state0, aircraft_cfg, limits)
-    guidance = ILSGuidance(gains, approach, limits, refs, aircraft_cfg)
-    wind = WindModel(**cfg["wind"])
 
-    log = {k: [] for k in ["x", "y", "h", "V", "psi", "gamma", "phi", "throttle", "n", "href"]}
+def run_one(cfg):
+    """
+    run_sim + summarize for one config (wind seed taken from cfg["wind"], default 0).
+    """
+    row = summarize(run_sim(cfg), cfg)
+    row["seed"] = int(cfg["wind"].get("seed", 0))
+    return row
+
+
+def sweep(config_grid, n_workers=None):
+    """
+    Run every config of a parameter grid in its own worker process (see pool_map).
+    Returns one metrics dict per config, in grid order
+    (pandas.DataFrame(rows) gives a table if pandas is installed).
+    """
+    return pool_map(run_one, config_grid, n_workers)
 
-    y_prev = model.y
-    h_prev = model.h
 
-    stable = True
-    t = 0.0
+def main():
+    model, guidance, wind, cfg = build_sim("configs/baseline.yaml")
+    warm_up_march(model, guidance)
+
+    dt = cfg["simulation"]["dt"]
+    T = cfg["simulation"]["total_time"]
+
+    approach = cfg["approach"]
 
     # Touchdown settings
     x_thresh = float(approach["x_threshold"])
@@ -54,82 +301,34 @@ def main():
     x_window = float(approach.get("x_window", 2000.0))
     h_ground = float(approach.get("h_ground", 1.0))
 
-    crossed_threshold_printed = False
-
-    while t < T:
-        y_dot = (model.y - y_prev) / dt
-        h_dot = (model.h - h_prev) / dt
-        y_prev, h_prev = model.y, model.h
-
-        phi_cmd, gamma_cmd, throttle_cmd, href = guidance.compute(
-            state={
-                "x": model.x,
-                "y": model.y,
-                "h": model.h,
-                "V": model.V,
-                "psi": model.psi,
-                "gamma": model.gamma,
-                "phi": model.phi,
-                "throttle": model.throttle,
-                "n": model.n,
-            },
-            rates={"y_dot": y_dot, "h_dot": h_dot},
-        )
-
-        out = model.step(dt, phi_cmd, gamma_cmd, throttle_cmd, wind.sample(t))
-
-        # Logging
-        log["x"].append(out["x"])
-        log["y"].append(out["y"])
-        log["h"].append(out["h"])
-        log["V"].append(out["V"])
-        log["psi"].append(out["psi"])
-        log["gamma"].append(out["gamma"])
-        log["phi"].append(out["phi"])
-        log["throttle"].append(out["throttle"])
-        log["n"].append(out["n"])
-        log["href"].append(href)
-
-        # Threshold crossing (once)
-        if (not crossed_threshold_printed) and (model.x >= x_thresh):
-            print(f"Crossed threshold: t={t:.1f}s, x={model.x - x_thresh:.1f} m, h={model.h:.1f} m, y={model.y:.1f} m")
-            crossed_threshold_printed = True
-
-        # Stabilized approach gate
-        y_err = model.y
-        V_err = refs["V_ref"] - model.V
-        stable = stable and stabilized_gate(y_err, V_err, model.gamma, model.h)
-
-        # Touchdown
-        if touchdown(
-            model.x,
-            model.h,
-            x_thresh=x_thresh,
-            h_thresh=h_thresh,
-            x_window=x_window,
-            h_ground=h_ground,
-            debug=True,
-        ):
-            break
+    ts, log, _, _, end = simulate(model, guidance, wind, dt, T, x_thresh, x_window, h_ground,
+                                  dtype=state_dtype(cfg))
+    xs, ys, hs = log[:, LOG_COLS["x"]], log[:, LOG_COLS["y"]], log[:, LOG_COLS["h"]]
 
-        # Missed approach if we exit runway window without touchdown
-        if model.x > x_thresh + x_window:
-            print("Missed approach: passed runway window without touchdown.")
-            break
+    # Threshold crossing (once)
+    crossed = np.flatnonzero(xs >= x_thresh)
+    if crossed.size:
+        i = crossed[0]
+        print(f"Crossed threshold: t={ts[i]:.1f}s, x={xs[i] - x_thresh:.1f} m, h={hs[i]:.1f} m, y={ys[i]:.1f} m")
+
+    # Touchdown / missed approach report
+    x_end, h_end = float(xs[-1]), float(hs[-1])
+    touchdown(x_end, h_end, x_thresh=x_thresh, h_thresh=h_thresh,
+              x_window=x_window, h_ground=h_ground, debug=True)
+    if end == END_MISSED:
+        print("Missed approach: passed runway window without touchdown.")
 
-        t += dt
+    t = end_time(len(ts), dt, end)
 
     # Metrics
-    y_rmse = rmse(log["y"])
-    h_err = np.array(log["href"]) - np.array(log["h"])
-    h_rmse = rmse(h_err)
+    m = summarize(log, cfg)
 
-    print(f"Finished at t={t:.1f}s, x={model.x:.1f} m, h={model.h:.1f} m")
-    print(f"RMSE lateral y: {y_rmse:.2f} m")
-    print(f"RMSE glideslope h: {h_rmse:.2f} m")
-    print(f"Stabilized approach: {'YES' if stable else 'NO'}")
+    print(f"Finished at t={t:.1f}s, x={x_end:.1f} m, h={h_end:.1f} m")
+    print(f"RMSE lateral y: {m['y_rmse']:.2f} m")
+    print(f"RMSE glideslope h: {m['h_rmse']:.2f} m")
+    print(f"Stabilized approach: {'YES' if m['stable'] else 'NO'}")
 
-    plot_results(log)
+    plot_results(log, LOG_COLS)
 
 
 if __name__ == "__main__":
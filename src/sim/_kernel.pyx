@@ -0,0 +1,213 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+#
+# Optional C build of run_sim._march (same arguments), for machines where numba is
+# missing or its JIT start-up is not acceptable:
+#
+#     python setup.py build_ext --inplace
+#
+# run_sim.simulate() uses it with SIM_MARCH=cython. Results match _march run as plain
+# Python to rounding, not bit for bit: numba's fastmath kernels round differently, and
+# gusty runs amplify that over a long march.
+# This is a hand port of sim/dynamics_kernel.step_state and sim/guidance.guidance_compute:
+# keep it in step with them (tests/test_march_parity.py catches drift).
+from libc.math cimport sin, cos, atan2, fmod, M_PI
+
+cdef double G = 9.81
+cdef double DEG = M_PI / 180.0
+
+# Flat state vector layout (sim.dynamics_kernel.IX_*)
+cdef enum:
+    IX_X = 0
+    IX_Y = 1
+    IX_H = 2
+    IX_V = 3
+    IX_PSI = 4
+    IX_GAMMA = 5
+    IX_PHI = 6
+    IX_THROTTLE = 7
+    IX_N = 8
+
+# End reasons (run_sim.END_*)
+cdef enum:
+    END_TIME = 0
+    END_TOUCHDOWN = 1
+    END_MISSED = 2
+
+
+cdef inline double clip(double a, double lo, double hi) noexcept nogil:
+    return min(max(a, lo), hi)
+
+
+cdef inline double wrap_pi(double a) noexcept nogil:
+    # Python float % semantics (result takes the sign of the divisor)
+    cdef double r = fmod(a + M_PI, 2.0 * M_PI)
+    if r < 0.0:
+        r += 2.0 * M_PI
+    return r - M_PI
+
+
+cdef inline void deriv(double V, double psi, double gamma, double phi, double n, double T,
+                       double Vwx, double Vwy, const double* dp, double* out) noexcept nogil:
+    # out = (Vx, Vy, Vh, V_dot, psi_dot, gamma_dot); dp = dynamics params
+    cdef double m = dp[0], S = dp[1], rho = dp[2], CD0 = dp[3], k = dp[4]
+
+    cdef double L = n * m * G
+    cdef double q = 0.5 * rho * V * V
+    cdef double qS = max(q * S, 1e-6)
+    cdef double CL = L / qS
+    cdef double CD = CD0 + k * CL * CL
+    cdef double D = qS * CD
+
+    out[3] = (T - D) / m - G * sin(gamma)
+    out[4] = (G / max(V, 1.0)) * n * sin(phi) / max(cos(gamma), 0.2)
+    out[5] = (n * G * cos(phi)) / max(V, 1.0) - (G * cos(gamma)) / max(V, 1.0)
+
+    out[0] = V * cos(gamma) * cos(psi) + Vwx
+    out[1] = V * cos(gamma) * sin(psi) + Vwy
+    out[2] = V * sin(gamma)
+
+
+cdef void step_state(double[::1] s, const double* dp, double dt,
+                     double phi_cmd, double gamma_cmd, double throttle_cmd,
+                     double Vwx, double Vwy, double* rates) noexcept nogil:
+    # dp = (m, S, rho, CD0, k, Tmax, thr_min, thr_max,
+    #       phi_max, phi_rate, n_min, n_max, n_rate, gamma_min, gamma_max)
+    cdef double Tmax = dp[5], thr_min = dp[6], thr_max = dp[7]
+    cdef double phi_max = dp[8], phi_rate = dp[9]
+    cdef double n_min = dp[10], n_max = dp[11], n_rate = dp[12]
+    cdef double gamma_min = dp[13], gamma_max = dp[14]
+
+    cdef double V = s[IX_V], psi = s[IX_PSI], gamma = s[IX_GAMMA]
+    cdef double phi = s[IX_PHI], throttle = s[IX_THROTTLE], n = s[IX_N]
+
+    # Commands: clamp
+    phi_cmd = clip(phi_cmd, -phi_max, phi_max)
+    gamma_cmd = clip(gamma_cmd, gamma_min, gamma_max)
+    throttle_cmd = clip(throttle_cmd, thr_min, thr_max)
+
+    # Actuator-like rate limits
+    phi = clip(phi + clip(phi_cmd - phi, -phi_rate * dt, phi_rate * dt), -phi_max, phi_max)
+    throttle = clip(throttle + clip(throttle_cmd - throttle, -0.8 * dt, 0.8 * dt), thr_min, thr_max)
+
+    # Load factor control to track gamma_cmd (tau_g = 1 s)
+    cdef double gamma_dot_cmd = (gamma_cmd - gamma) / 1.0
+    cdef double n_cmd = ((gamma_dot_cmd * max(V, 1.0)) / G + cos(gamma)) / max(cos(phi), 0.2)
+    n_cmd = clip(n_cmd, n_min, n_max)
+    n = clip(n + clip(n_cmd - n, -n_rate * dt, n_rate * dt), n_min, n_max)
+
+    cdef double T = throttle * Tmax
+
+    # RK4 on (x, y, h, V, psi, gamma)
+    cdef double k1[6]
+    cdef double k2[6]
+    cdef double k3[6]
+    cdef double k4[6]
+    cdef double h2 = 0.5 * dt
+    deriv(V, psi, gamma, phi, n, T, Vwx, Vwy, dp, k1)
+    deriv(V + h2 * k1[3], psi + h2 * k1[4], gamma + h2 * k1[5], phi, n, T, Vwx, Vwy, dp, k2)
+    deriv(V + h2 * k2[3], psi + h2 * k2[4], gamma + h2 * k2[5], phi, n, T, Vwx, Vwy, dp, k3)
+    deriv(V + dt * k3[3], psi + dt * k3[4], gamma + dt * k3[5], phi, n, T, Vwx, Vwy, dp, k4)
+
+    cdef double Vx = (k1[0] + 2.0 * k2[0] + 2.0 * k3[0] + k4[0]) / 6.0
+    cdef double Vy = (k1[1] + 2.0 * k2[1] + 2.0 * k3[1] + k4[1]) / 6.0
+    cdef double Vh = (k1[2] + 2.0 * k2[2] + 2.0 * k3[2] + k4[2]) / 6.0
+
+    V = clip(V + dt * (k1[3] + 2.0 * k2[3] + 2.0 * k3[3] + k4[3]) / 6.0, 45.0, 110.0)
+    psi = psi + dt * (k1[4] + 2.0 * k2[4] + 2.0 * k3[4] + k4[4]) / 6.0
+    gamma = clip(gamma + dt * (k1[5] + 2.0 * k2[5] + 2.0 * k3[5] + k4[5]) / 6.0, gamma_min, gamma_max)
+
+    s[IX_X] += Vx * dt
+    s[IX_Y] += Vy * dt
+    s[IX_H] += Vh * dt
+
+    # Ground clamp / touchdown handling
+    if s[IX_H] <= 0.0:
+        s[IX_H] = 0.0
+        if Vh < 0.0:
+            gamma = 0.0
+        phi = clip(phi, -5.0 * DEG, 5.0 * DEG)
+
+    s[IX_V] = V
+    s[IX_PSI] = psi
+    s[IX_GAMMA] = gamma
+    s[IX_PHI] = phi
+    s[IX_THROTTLE] = throttle
+    s[IX_N] = n
+
+    rates[0] = Vy
+    rates[1] = Vh
+
+
+cdef void guidance(double[::1] s, double y_dot, double h_dot, const double* gp,
+                   double* cmd) noexcept nogil:
+    # gp = (K_h_P, K_h_D, K_V_P, tan_gs, gamma_gs, h_thresh, x_thresh, phi_max, V_ref)
+    # cmd = (phi_cmd, gamma_cmd, throttle_cmd)
+    cdef double K_h_P = gp[0], K_h_D = gp[1], K_V_P = gp[2]
+    cdef double tan_gs = gp[3], gamma_gs = gp[4], h_thresh = gp[5], x_thresh = gp[6]
+    cdef double phi_max = gp[7], V_ref = gp[8]
+
+    cdef double x = s[IX_X], y = s[IX_Y], h = s[IX_H], V = s[IX_V]
+
+    # Lateral: yaw-rate command to bank (coordinated turn)
+    cdef double psi_dot_cmd = -(y / 120.0 + y_dot / 25.0 + wrap_pi(s[IX_PSI]))
+    cmd[0] = clip(atan2(psi_dot_cmd * max(V, 1.0), G), -phi_max, phi_max)
+
+    # Vertical: glideslope + flare after threshold
+    cdef double href = max(h_thresh + tan_gs * (x_thresh - x), 0.0)
+    cdef double pre = 2.0 if x < x_thresh else 1.0
+    cdef double gamma_cmd = gamma_gs - (pre * 4.0 * K_h_P * (h - href) + pre * 2.0 * K_h_D * h_dot)
+    gamma_cmd -= 0.7 * DEG
+    if x >= x_thresh and h < 80.0:
+        gamma_cmd = gamma_cmd * max(h, 0.0) / 80.0
+    cmd[1] = clip(gamma_cmd, -20.0 * DEG, 3.0 * DEG)
+
+    # Speed
+    cmd[2] = clip(s[IX_THROTTLE] + K_V_P * (V_ref - V), 0.1, 1.0)
+
+
+def run_march(double[::1] state, tuple dyn_params, tuple gd_params,
+              double[::1] Vwx, double[::1] Vwy, double dt,
+              double x_thresh, double x_window, double h_ground, bint stop,
+              double[:, ::1] log):
+    """
+    Same contract as run_sim._march: march up to len(log) steps from state (in place),
+    writing the state after each step into log[i, :9] and its h_dot into log[i, 9].
+    Returns (rows written, end reason).
+    """
+    cdef double dp[15]
+    cdef double gp[9]
+    cdef double cmd[3]
+    cdef double rates[2]
+    cdef Py_ssize_t i, j, N = log.shape[0], ns = state.shape[0]
+    cdef double x, x_hi = x_thresh + x_window
+
+    for j in range(15):
+        dp[j] = dyn_params[j]
+    for j in range(9):
+        gp[j] = gd_params[j]
+
+    # Initial rates: still-air kinematics
+    rates[0] = state[IX_V] * cos(state[IX_GAMMA]) * sin(state[IX_PSI])
+    rates[1] = state[IX_V] * sin(state[IX_GAMMA])
+
+    with nogil:
+        for i in range(N):
+            guidance(state, rates[0], rates[1], gp, cmd)
+            step_state(state, dp, dt, cmd[0], cmd[1], cmd[2], Vwx[i], Vwy[i], rates)
+
+            for j in range(ns):
+                log[i, j] = state[j]
+            log[i, ns] = rates[1]
+
+            if not stop:
+                continue
+            x = state[IX_X]
+            if x >= x_thresh and x <= x_hi and state[IX_H] <= h_ground:
+                with gil:
+                    return i + 1, END_TOUCHDOWN
+            # Missed approach if we exit runway window without touchdown
+            if x > x_hi:
+                with gil:
+                    return i + 1, END_MISSED
+
+    return N, END_TIME
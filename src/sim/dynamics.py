@@ -1,6 +1,12 @@
+from math import radians
+
 import numpy as np
 
-g = 9.81
+# Kernels and state layout live in sim.dynamics_kernel; re-exported here
+from sim.dynamics_kernel import (
+    g, IX_X, IX_Y, IX_H, IX_V, IX_PSI, IX_GAMMA, IX_PHI, IX_THROTTLE, IX_N, STATE_KEYS,
+    still_air_rates, step_state,
+)
 
 
 class PointMass3DOF:
@@ -25,92 +31,53 @@ class PointMass3DOF:
         self.thr_min = float(aircraft["throttle_min"])
         self.thr_max = float(aircraft["throttle_max"])
 
-        self.phi_max = np.deg2rad(float(limits["phi_deg_max"]))
-        self.phi_rate = np.deg2rad(float(limits["phi_rate_deg_s"]))
+        self.phi_max = radians(float(limits["phi_deg_max"]))
+        self.phi_rate = radians(float(limits["phi_rate_deg_s"]))
 
         self.n_min = float(limits["n_min"])
         self.n_max = float(limits["n_max"])
         self.n_rate = float(limits["n_rate"])
 
-        self.gamma_min = np.deg2rad(float(limits["gamma_deg_min"]))
-        self.gamma_max = np.deg2rad(float(limits["gamma_deg_max"]))
+        self.gamma_min = radians(float(limits["gamma_deg_min"]))
+        self.gamma_max = radians(float(limits["gamma_deg_max"]))
 
         # Hard clamp initial values
-        self.throttle = float(np.clip(self.throttle, self.thr_min, self.thr_max))
-        self.n = float(np.clip(self.n, self.n_min, self.n_max))
-        self.gamma = float(np.clip(self.gamma, self.gamma_min, self.gamma_max))
-        self.phi = float(np.clip(self.phi, -self.phi_max, self.phi_max))
-
-    def aero_forces(self):
-        # Lift via load factor
-        L = self.n * self.m * g
-
-        q = 0.5 * self.rho * self.V ** 2
-        qS = max(q * self.S, 1e-6)
-
-        CL = L / qS
-        CD = self.CD0 + self.k * (CL ** 2)
-        D = qS * CD
-
-        T = self.throttle * self.Tmax
-        return T, D
-
-    def step(self, dt: float, phi_cmd: float, gamma_cmd: float, throttle_cmd: float, wind_xy):
-        # --- Commands: clamp ---
-        phi_cmd = float(np.clip(phi_cmd, -self.phi_max, self.phi_max))
-        gamma_cmd = float(np.clip(gamma_cmd, self.gamma_min, self.gamma_max))
-        throttle_cmd = float(np.clip(throttle_cmd, self.thr_min, self.thr_max))
-
-        # --- Actuator-like rate limits ---
-        dphi = np.clip(phi_cmd - self.phi, -self.phi_rate * dt, self.phi_rate * dt)
-        self.phi = float(np.clip(self.phi + dphi, -self.phi_max, self.phi_max))
-
-        dthr = np.clip(throttle_cmd - self.throttle, -0.8 * dt, 0.8 * dt)
-        self.throttle = float(np.clip(self.throttle + dthr, self.thr_min, self.thr_max))
-
-        # --- Load factor control to track gamma_cmd ---
-        tau_g = 1.0
-        gamma_dot_cmd = (gamma_cmd - self.gamma) / max(tau_g, 0.2)
-
-        Veff = max(self.V, 1.0)
-        n_cmd = ((gamma_dot_cmd * Veff) / g + np.cos(self.gamma)) / max(np.cos(self.phi), 0.2)
-        n_cmd = float(np.clip(n_cmd, self.n_min, self.n_max))
-
-        dn = np.clip(n_cmd - self.n, -self.n_rate * dt, self.n_rate * dt)
-        self.n = float(np.clip(self.n + dn, self.n_min, self.n_max))
-
-        # --- Forces ---
-        T, D = self.aero_forces()
-
-        # --- 3DOF EOM ---
-        V_dot = (T - D) / self.m - g * np.sin(self.gamma)
-        self.V = float(np.clip(self.V + V_dot * dt, 45.0, 110.0))
-
-        psi_dot = (g / max(self.V, 1.0)) * self.n * np.sin(self.phi) / max(np.cos(self.gamma), 0.2)
-        self.psi = float(self.psi + psi_dot * dt)
+        self.throttle = min(max(self.throttle, self.thr_min), self.thr_max)
+        self.n = min(max(self.n, self.n_min), self.n_max)
+        self.gamma = min(max(self.gamma, self.gamma_min), self.gamma_max)
+        self.phi = min(max(self.phi, -self.phi_max), self.phi_max)
+
+        # Kernel inputs: homogeneous float tuple + the live state vector (layout IX_*),
+        # advanced in place by step() and mirrored to the attributes above
+        self.params = tuple(float(v) for v in (
+            self.m, self.S, self.rho, self.CD0, self.k, self.Tmax,
+            self.thr_min, self.thr_max,
+            self.phi_max, self.phi_rate,
+            self.n_min, self.n_max, self.n_rate,
+            self.gamma_min, self.gamma_max,
+        ))
+        self.state_vec = self.state_vector()
+
+        # True lateral / vertical rates, updated by step()
+        self.y_dot, self.h_dot = (float(r) for r in still_air_rates(self.state_vec))
+
+    def state_vector(self) -> np.ndarray:
+        """
+        Current state as a new flat array (layout IX_*).
+        """
+        return np.array([getattr(self, k) for k in STATE_KEYS], dtype=float)
+
+    def step(self, dt: float, phi_cmd: float, gamma_cmd: float, throttle_cmd: float, wind_xy) -> np.ndarray:
+        """
+        Advance one step of dt; returns state_vec (updated in place, not a copy).
+        """
+        s = self.state_vec
+        Vwx, Vwy = wind_xy
+        y_dot, h_dot = step_state(s, self.params, float(dt), float(phi_cmd), float(gamma_cmd), float(throttle_cmd),
+                                  float(Vwx), float(Vwy))
+        self.y_dot, self.h_dot = float(y_dot), float(h_dot)
 
-        gamma_dot = (self.n * g * np.cos(self.phi)) / max(self.V, 1.0) - (g * np.cos(self.gamma)) / max(self.V, 1.0)
-        self.gamma = float(np.clip(self.gamma + gamma_dot * dt, self.gamma_min, self.gamma_max))
+        for i, k in enumerate(STATE_KEYS):
+            setattr(self, k, float(s[i]))
 
-        # --- Kinematics + wind ---
-        Vwx, Vwy = wind_xy
-        Vx = self.V * np.cos(self.gamma) * np.cos(self.psi) + Vwx
-        Vy = self.V * np.cos(self.gamma) * np.sin(self.psi) + Vwy
-        Vh = self.V * np.sin(self.gamma)
-
-        self.x += Vx * dt
-        self.y += Vy * dt
-        self.h += Vh * dt
-
-        # --- Ground clamp / touchdown handling ---
-        if self.h <= 0.0:
-            self.h = 0.0
-            if Vh < 0.0:
-                self.gamma = 0.0
-            self.phi = float(np.clip(self.phi, -5.0 * np.pi / 180, 5.0 * np.pi / 180))
-
-        return {
-            "x": self.x, "y": self.y, "h": self.h,
-            "V": self.V, "psi": self.psi, "gamma": self.gamma,
-            "phi": self.phi, "throttle": self.throttle, "n": self.n
-        }
+        return s
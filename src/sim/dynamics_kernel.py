@@ -0,0 +1,135 @@
+# Scalar point-mass kernels on the flat state vector (layout IX_*) and a float params
+# tuple: math.* on scalars, no allocation per step.
+from math import sin, cos, pi
+
+from sim.jit import njit
+
+g = 9.81
+
+# Flat state vector layout used by the jitted kernels
+IX_X, IX_Y, IX_H, IX_V, IX_PSI, IX_GAMMA, IX_PHI, IX_THROTTLE, IX_N = range(9)
+STATE_KEYS = ("x", "y", "h", "V", "psi", "gamma", "phi", "throttle", "n")
+
+
+@njit(cache=True, fastmath=True)
+def _clip(a, lo, hi):
+    return min(max(a, lo), hi)
+
+
+@njit(cache=True, fastmath=True)
+def still_air_rates(state):
+    """
+    (y_dot, h_dot) from the flight-path kinematics, without wind.
+    """
+    V = state[IX_V]
+    gamma = state[IX_GAMMA]
+    return V * cos(gamma) * sin(state[IX_PSI]), V * sin(gamma)
+
+
+@njit(cache=True, fastmath=True)
+def _deriv(V, psi, gamma, phi, n, T, Vwx, Vwy, m, S, rho, CD0, k):
+    """
+    Time derivatives of (x, y, h, V, psi, gamma) for a fixed bank, load factor and thrust.
+    """
+    # --- Forces (lift via load factor) ---
+    L = n * m * g
+    q = 0.5 * rho * V ** 2
+    qS = max(q * S, 1e-6)
+    CL = L / qS
+    CD = CD0 + k * (CL ** 2)
+    D = qS * CD
+
+    # --- 3DOF EOM ---
+    V_dot = (T - D) / m - g * sin(gamma)
+    psi_dot = (g / max(V, 1.0)) * n * sin(phi) / max(cos(gamma), 0.2)
+    gamma_dot = (n * g * cos(phi)) / max(V, 1.0) - (g * cos(gamma)) / max(V, 1.0)
+
+    # --- Kinematics + wind ---
+    Vx = V * cos(gamma) * cos(psi) + Vwx
+    Vy = V * cos(gamma) * sin(psi) + Vwy
+    Vh = V * sin(gamma)
+
+    return Vx, Vy, Vh, V_dot, psi_dot, gamma_dot
+
+
+@njit(cache=True, fastmath=True)
+def step_state(state, params, dt, phi_cmd, gamma_cmd, throttle_cmd, Vwx, Vwy):
+    """
+    Advance the flat state vector in place by one step of dt.
+    params is the float tuple built by PointMass3DOF (see PointMass3DOF.params).
+    Actuators (bank, throttle, load factor) are rate-limited once per step and held;
+    the point-mass EOM are then integrated with classic RK4.
+    Returns the step-averaged (y_dot, h_dot) (wind included).
+    """
+    (m, S, rho, CD0, k, Tmax, thr_min, thr_max,
+     phi_max, phi_rate, n_min, n_max, n_rate, gamma_min, gamma_max) = params
+
+    V = state[IX_V]
+    psi = state[IX_PSI]
+    gamma = state[IX_GAMMA]
+    phi = state[IX_PHI]
+    throttle = state[IX_THROTTLE]
+    n = state[IX_N]
+
+    # --- Commands: clamp ---
+    phi_cmd = _clip(phi_cmd, -phi_max, phi_max)
+    gamma_cmd = _clip(gamma_cmd, gamma_min, gamma_max)
+    throttle_cmd = _clip(throttle_cmd, thr_min, thr_max)
+
+    # --- Actuator-like rate limits ---
+    dphi = _clip(phi_cmd - phi, -phi_rate * dt, phi_rate * dt)
+    phi = _clip(phi + dphi, -phi_max, phi_max)
+
+    dthr = _clip(throttle_cmd - throttle, -0.8 * dt, 0.8 * dt)
+    throttle = _clip(throttle + dthr, thr_min, thr_max)
+
+    # --- Load factor control to track gamma_cmd ---
+    tau_g = 1.0
+    gamma_dot_cmd = (gamma_cmd - gamma) / max(tau_g, 0.2)
+
+    Veff = max(V, 1.0)
+    n_cmd = ((gamma_dot_cmd * Veff) / g + cos(gamma)) / max(cos(phi), 0.2)
+    n_cmd = _clip(n_cmd, n_min, n_max)
+
+    dn = _clip(n_cmd - n, -n_rate * dt, n_rate * dt)
+    n = _clip(n + dn, n_min, n_max)
+
+    T = throttle * Tmax
+
+    # --- RK4 on (x, y, h, V, psi, gamma) ---
+    h2 = 0.5 * dt
+    k1x, k1y, k1h, k1V, k1p, k1g = _deriv(V, psi, gamma, phi, n, T, Vwx, Vwy, m, S, rho, CD0, k)
+    k2x, k2y, k2h, k2V, k2p, k2g = _deriv(V + h2 * k1V, psi + h2 * k1p, gamma + h2 * k1g,
+                                          phi, n, T, Vwx, Vwy, m, S, rho, CD0, k)
+    k3x, k3y, k3h, k3V, k3p, k3g = _deriv(V + h2 * k2V, psi + h2 * k2p, gamma + h2 * k2g,
+                                          phi, n, T, Vwx, Vwy, m, S, rho, CD0, k)
+    k4x, k4y, k4h, k4V, k4p, k4g = _deriv(V + dt * k3V, psi + dt * k3p, gamma + dt * k3g,
+                                          phi, n, T, Vwx, Vwy, m, S, rho, CD0, k)
+
+    Vx = (k1x + 2.0 * k2x + 2.0 * k3x + k4x) / 6.0
+    Vy = (k1y + 2.0 * k2y + 2.0 * k3y + k4y) / 6.0
+    Vh = (k1h + 2.0 * k2h + 2.0 * k3h + k4h) / 6.0
+
+    V = _clip(V + dt * (k1V + 2.0 * k2V + 2.0 * k3V + k4V) / 6.0, 45.0, 110.0)
+    psi = psi + dt * (k1p + 2.0 * k2p + 2.0 * k3p + k4p) / 6.0
+    gamma = _clip(gamma + dt * (k1g + 2.0 * k2g + 2.0 * k3g + k4g) / 6.0, gamma_min, gamma_max)
+
+    state[IX_X] += Vx * dt
+    state[IX_Y] += Vy * dt
+    state[IX_H] += Vh * dt
+
+    # --- Ground clamp / touchdown handling ---
+    if state[IX_H] <= 0.0:
+        state[IX_H] = 0.0
+        if Vh < 0.0:
+            gamma = 0.0
+        phi = _clip(phi, -5.0 * pi / 180, 5.0 * pi / 180)
+
+    state[IX_V] = V
+    state[IX_PSI] = psi
+    state[IX_GAMMA] = gamma
+    state[IX_PHI] = phi
+    state[IX_THROTTLE] = throttle
+    state[IX_N] = n
+
+    return Vy, Vh
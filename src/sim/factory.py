@@ -0,0 +1,61 @@
+import math
+
+import yaml
+
+from sim.dynamics import PointMass3DOF, step_state
+from sim.guidance import ILSGuidance, guidance_compute
+from sim.wind import WindModel
+
+deg = math.pi / 180
+
+
+def build_from_config(cfg: dict):
+    """
+    Model, guidance and wind from a loaded config dict.
+    """
+    approach = cfg["approach"]
+    aircraft_cfg = cfg["aircraft"]
+    limits = cfg["limits"]
+    refs = cfg["references"]
+    gains = cfg["guidance_gains"]
+
+    init = cfg["initial_state"]
+    state0 = {
+        "x": float(init["x"]),
+        "y": float(init["y"]),
+        "h": float(init["h"]),
+        "V": float(init["V"]),
+        "psi": float(init["psi_deg"]) * deg,
+        "gamma": float(init["gamma_deg"]) * deg,
+        "phi": float(init["phi_deg"]) * deg,
+        "throttle": float(init["throttle"]),
+        "n": float(init["n"]),
+    }
+
+    model = PointMass3DOF(state0, aircraft_cfg, limits)
+    guidance = ILSGuidance(gains, approach, limits, refs, aircraft_cfg)
+    wind = WindModel(**cfg["wind"])
+    return model, guidance, wind
+
+
+def warm_up(model: PointMass3DOF, guidance: ILSGuidance):
+    """
+    Call the jitted kernels once on a scratch copy of the state, so compilation
+    (or loading from the numba cache) happens now and not on the first animation frame.
+    The whole-run marches are warmed separately (run_sim.warm_up_march).
+    """
+    s = model.state_vector()
+    guidance_compute(s, 0.0, 0.0, guidance.params)
+    step_state(s, model.params, 0.01, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+
+def build_sim(path: str = "configs/baseline.yaml"):
+    """
+    Load a YAML config and return (model, guidance, wind, cfg) with kernels warmed up.
+    """
+    with open(path, "r") as f:
+        cfg = yaml.safe_load(f)
+
+    model, guidance, wind = build_from_config(cfg)
+    warm_up(model, guidance)
+    return model, guidance, wind, cfg
@@ -1,11 +1,83 @@
+from math import atan2, tan, pi, radians
+
 import numpy as np
 
-deg = np.pi / 180
+from sim.jit import njit
+from sim.dynamics import IX_X, IX_Y, IX_H, IX_V, IX_PSI, IX_THROTTLE
+
+deg = pi / 180
 g = 9.81
 
 
+@njit(cache=True, fastmath=True)
 def wrap_pi(a):
-    return (a + np.pi) % (2 * np.pi) - np.pi
+    return (a + pi) % (2 * pi) - pi
+
+
+@njit(cache=True, fastmath=True)
+def guidance_compute(state, y_dot, h_dot, params):
+    """
+    Guidance law on the flat state vector (layout sim.dynamics.IX_*).
+    params is the float tuple built by ILSGuidance (see ILSGuidance.params).
+    Returns (phi_cmd, gamma_cmd, throttle_cmd, href).
+    """
+    K_h_P, K_h_D, K_V_P, tan_gs, gamma_gs, h_thresh, x_thresh, phi_max, V_ref = params
+
+    x = state[IX_X]
+    y = state[IX_Y]
+    h = state[IX_H]
+    V = state[IX_V]
+    psi = state[IX_PSI]
+    throttle = state[IX_THROTTLE]
+
+    # -------------------------
+    # LATERAL (robust localizer via yaw-rate command)
+    # -------------------------
+    # Drive y -> 0 and psi -> 0 (runway heading assumed 0 rad)
+    k_y = 1.0 / 120.0   # [1/s] per meter
+    k_d = 1.0 / 25.0    # damping on y_dot
+    k_psi = 1.0 / 1.0   # heading stabilization
+
+    psi_dot_cmd = -(k_y * y + k_d * y_dot + k_psi * wrap_pi(psi))
+
+    # Convert yaw-rate to bank (coordinated turn)
+    phi_cmd = atan2(psi_dot_cmd * max(V, 1.0), g)
+    phi_cmd = min(max(phi_cmd, -phi_max), phi_max)
+
+    # -------------------------
+    # VERTICAL (glideslope + flare after threshold)
+    # -------------------------
+    # Reference height along glideslope, continued past threshold (so it can reach 0m)
+    href = h_thresh + tan_gs * (x_thresh - x)
+    if href < 0.0:
+        href = 0.0
+    e_h = h - href
+
+    # Stronger vertical correction (you were ~+5-10m high before)
+    # Stronger correction BEFORE threshold to hit h_thresh accurately
+    pre = 2.0 if x < x_thresh else 1.0
+
+    gamma_cmd = gamma_gs - (pre * 4.0 * K_h_P * e_h + pre * 2.0 * K_h_D * h_dot)
+
+    # Slight down-bias to remove persistent high bias at threshold
+    gamma_cmd -= 0.7 * deg
+
+    # Flare ONLY after passing threshold (linear blend to 0 at h=0)
+    flare_h = 80.0
+    if x >= x_thresh and h < flare_h:
+        gamma_cmd = gamma_cmd * max(h, 0.0) / flare_h
+
+    # Allow enough descent authority to actually get to the ground
+    gamma_cmd = min(max(gamma_cmd, -20 * deg), 3 * deg)
+
+    # -------------------------
+    # SPEED
+    # -------------------------
+    eV = V_ref - V
+    throttle_cmd = throttle + K_V_P * eV
+    throttle_cmd = min(max(throttle_cmd, 0.1), 1.0)
+
+    return phi_cmd, gamma_cmd, throttle_cmd, href
 
 
 class ILSGuidance:
@@ -26,73 +98,37 @@ class ILSGuidance:
         self.x_thresh = approach["x_threshold"]
 
         # Limits / references
-        self.phi_max = np.deg2rad(limits["phi_deg_max"])
+        self.phi_max = radians(limits["phi_deg_max"])
         self.V_ref = refs["V_ref"]
 
+        # Glideslope constants, computed once
+        self.tan_gs = tan(self.gs_deg * deg)
+        self.gamma_gs = -self.gs_deg * deg
+
+        # Kernel inputs: homogeneous float tuple
+        self.params = tuple(float(v) for v in (
+            self.K_h_P, self.K_h_D, self.K_V_P,
+            self.tan_gs, self.gamma_gs, self.h_thresh, self.x_thresh,
+            self.phi_max, self.V_ref,
+        ))
+
     def h_ref(self, x: float) -> float:
         """
         Reference height along glideslope that continues past threshold (so it can reach 0m).
         """
-        gs = self.gs_deg * deg
-        d = self.x_thresh - x  # allow negative after threshold
-        return max(0.0, self.h_thresh + np.tan(gs) * d)
-
-    def compute(self, state: dict, rates: dict):
-        x = state["x"]
-        y = state["y"]
-        h = state["h"]
-        V = state["V"]
-        psi = state["psi"]
-        throttle = state["throttle"]
-
-        y_dot = rates["y_dot"]
-        h_dot = rates["h_dot"]
-
-        # -------------------------
-        # LATERAL (robust localizer via yaw-rate command)
-        # -------------------------
-        # Drive y -> 0 and psi -> 0 (runway heading assumed 0 rad)
-        k_y = 1.0 / 120.0   # [1/s] per meter
-        k_d = 1.0 / 25.0    # damping on y_dot
-        k_psi = 1.0 / 1.0   # heading stabilization
-
-        psi_dot_cmd = -(k_y * y + k_d * y_dot + k_psi * wrap_pi(psi))
-
-        # Convert yaw-rate to bank (coordinated turn)
-        phi_cmd = np.arctan2(psi_dot_cmd * max(V, 1.0), g)
-        phi_cmd = float(np.clip(phi_cmd, -self.phi_max, self.phi_max))
-
-        # -------------------------
-        # VERTICAL (glideslope + flare after threshold)
-        # -------------------------
-        href = self.h_ref(x)
-        e_h = h - href
-
-        gamma_gs = -self.gs_deg * deg
+        return max(0.0, self.h_thresh + self.tan_gs * (self.x_thresh - float(x)))
 
-        # Stronger vertical correction (you were ~+5-10m high before)
-        # Stronger correction BEFORE threshold to hit h_thresh accurately
-        pre = 2.0 if x < self.x_thresh else 1.0
-
-        gamma_cmd = gamma_gs - (pre * 4.0 * self.K_h_P * e_h + pre * 2.0 * self.K_h_D * h_dot)
-
-        # Slight down-bias to remove persistent high bias at threshold
-        gamma_cmd -= 0.7 * deg
-
-        # Flare ONLY after passing threshold
-        flare_h = 80.0
-        if x >= self.x_thresh and h < flare_h:
-            gamma_cmd = np.interp(h, [0.0, flare_h], [0.0, gamma_cmd])
-
-        # Allow enough descent authority to actually get to the ground
-        gamma_cmd = float(np.clip(gamma_cmd, -20 * deg, 3 * deg))
-
-        # -------------------------
-        # SPEED
-        # -------------------------
-        eV = self.V_ref - V
-        throttle_cmd = throttle + self.K_V_P * eV
-        throttle_cmd = float(np.clip(throttle_cmd, 0.1, 1.0))
-
-        return phi_cmd, gamma_cmd, throttle_cmd, href
+    def h_ref_vec(self, x):
+        """
+        h_ref over an array of x positions in one NumPy call.
+        """
+        d = self.x_thresh - np.asarray(x, dtype=float)
+        return np.maximum(0.0, self.h_thresh + self.tan_gs * d)
 
+    def compute(self, state_vec, y_dot: float, h_dot: float):
+        """
+        Commands for a flat state vector (layout sim.dynamics.IX_*, e.g. PointMass3DOF.state_vec).
+        Returns (phi_cmd, gamma_cmd, throttle_cmd, href).
+        """
+        phi_cmd, gamma_cmd, throttle_cmd, href = guidance_compute(state_vec, float(y_dot), float(h_dot), self.params)
+        return float(phi_cmd), float(gamma_cmd), float(throttle_cmd), float(href)
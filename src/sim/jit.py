@@ -0,0 +1,27 @@
+import os
+
+try:
+    import numba
+except ImportError:  # numba is optional: kernels then run as plain Python
+    numba = None
+
+# Same switch numba honours itself; also respected when numba is missing.
+# Note: numba's on-disk cache (cache=True) is keyed on the defining file only, so a jitted
+# caller in another file keeps the old inlined kernel until its own cache is cleared.
+DISABLE_JIT = os.environ.get("NUMBA_DISABLE_JIT", "0") not in ("", "0")
+
+
+def njit(*args, **kwargs):
+    """
+    numba.njit when numba is available and not disabled, otherwise a no-op decorator.
+    Usable both bare (@njit) and with options (@njit(cache=True)).
+    """
+    if numba is None or DISABLE_JIT:
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+    return numba.njit(*args, **kwargs)
+
+
+# numba.prange splits a loop across threads under njit(parallel=True); plain range otherwise
+prange = range if numba is None else numba.prange
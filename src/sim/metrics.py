@@ -2,8 +2,31 @@ import numpy as np
 
 
 def rmse(arr):
-    a = np.asarray(arr, dtype=float)
-    return float(np.sqrt(np.mean(a * a))) if a.size else float("nan")
+    a = np.asarray(arr, dtype=float).ravel()
+    n = a.size
+    # a @ a: one dot product, no a*a temporary
+    return float(np.sqrt(a @ a / n)) if n else float("nan")
+
+
+# One-shot debug prints (module state instead of per-call attribute checks)
+_printed = {"args": False, "hit": False}
+
+
+def touchdown_debug_once(x_thresh, h_thresh=None, x_window=2000.0, h_ground=1.0, h_touch=None, **kwargs):
+    """
+    Print the touchdown settings, once per process. Call it before a stepping loop
+    instead of passing debug=True to every touchdown() call.
+    """
+    if _printed["args"]:
+        return
+    print("[touchdown args]",
+          "x_thresh=", x_thresh,
+          "x_window=", x_window,
+          "h_ground=", h_ground,
+          "h_touch=", h_touch,
+          "h_thresh=", h_thresh,
+          "extra=", kwargs)
+    _printed["args"] = True
 
 
 def touchdown(
@@ -13,34 +36,30 @@ def touchdown(
     h_ground=1.0,
     h_touch=None,
     debug=False,
+    x_hi=None,
     **kwargs
 ):
     """
     Touchdown when:
       - x >= x_thresh
-      - x <= x_thresh + x_window
+      - x <= x_thresh + x_window  (or x_hi, if the caller precomputed it)
       - h <= h_ground
 
     Accepts extra kwargs for compatibility.
     """
     if h_touch is not None:
         h_ground = h_touch
+    if x_hi is None:
+        x_hi = x_thresh + x_window
+
+    td = x_thresh <= x <= x_hi and h <= h_ground
 
-    if debug and not hasattr(touchdown, "_printed"):
-        print("[touchdown args]",
-              "x_thresh=", x_thresh,
-              "x_window=", x_window,
-              "h_ground=", h_ground,
-              "h_touch=", h_touch,
-              "h_thresh=", h_thresh,
-              "extra=", kwargs)
-        touchdown._printed = True
-
-    td = (x >= x_thresh) and (x <= x_thresh + x_window) and (h <= h_ground)
-
-    if debug and td and not hasattr(touchdown, "_hit"):
-        print(f"[TOUCHDOWN] x={x:.1f} h={h:.2f} (window {x_thresh:.1f}..{x_thresh + x_window:.1f}, h_ground={h_ground})")
-        touchdown._hit = True
+    if debug:
+        touchdown_debug_once(x_thresh, h_thresh=h_thresh, x_window=x_window, h_ground=h_ground,
+                             h_touch=h_touch, **kwargs)
+        if td and not _printed["hit"]:
+            print(f"[TOUCHDOWN] x={x:.1f} h={h:.2f} (window {x_thresh:.1f}..{x_hi:.1f}, h_ground={h_ground})")
+            _printed["hit"] = True
 
     return td
 
@@ -1,18 +1,23 @@
 # src/sim/run_sim.py
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
 import time
 import math
-from typing import Dict, Tuple, List
+from typing import Dict
 
 import numpy as np
 
+try:
+    from sim.jit import njit
+except ImportError:  # run as a script from src/sim
+    from jit import njit
+
 
 @dataclass
 class SimConfig:
     dt: float = 0.01          # 100 Hz
     t_final: float = 30.0
-    real_time: bool = True
+    real_time: bool = False   # pace to wall clock (run_realtime) instead of running flat out (run_batch)
     log_hz: int = 20
 
 
@@ -30,175 +35,240 @@ class AircraftParams:
     Iy: float = 2500.0        # kg m^2 (toy pitch inertia)
 
 
-@dataclass
-class Control:
-    throttle: float = 0.4     # 0..1
-    elevator: float = 0.0     # rad (toy)
-    # (later: aileron, rudder)
+# 2D longitudinal toy model state: flat float array y = [x, z, u, w, theta, q]
+#   x forward position, z down position
+#   u forward body velocity, w vertical body velocity (down)
+#   theta pitch angle, q pitch rate
+# Controls are two floats: throttle (0..1) and elevator (rad, toy).
+STATE_FIELDS = ("x", "z", "u", "w", "theta", "q")
 
 
-@dataclass
-class State:
-    # 2D longitudinal toy model: x,z,u,w,theta,q
-    # x forward position, z down position
-    x: float = 0.0
-    z: float = 0.0
-    u: float = 60.0           # forward body velocity
-    w: float = 0.0            # vertical body velocity (down)
-    theta: float = 0.0        # pitch angle
-    q: float = 0.0            # pitch rate
+def make_state(x=0.0, z=0.0, u=60.0, w=0.0, theta=0.0, q=0.0) -> np.ndarray:
+    return np.array([x, z, u, w, theta, q], dtype=float)
+
+
+def snapshot_state(y: np.ndarray) -> Dict[str, float]:
+    return dict(zip(STATE_FIELDS, y.tolist()))
 
 
 class AircraftModel:
     def __init__(self, p: AircraftParams):
         self.p = p
+        # Homogeneous float tuple in AircraftParams field order, for the jitted step
+        self.params = tuple(float(v) for v in astuple(p))
+
+
+@njit(cache=True, fastmath=True)
+def _derivs(u, w, theta, q, T, M_elev, params):
+    """
+    Toy longitudinal dynamics as plain scalar arithmetic, for a thrust T and elevator
+    moment M_elev held over the step (see rk4_step_jit): CL(alpha), CD(CL) aero resolved
+    to body axes (X forward, Z down), weight, elevator moment + pitch damping.
+    Returns (dx, dz, du, dw, dtheta, dq).
+    """
+    mass, g, S, rho, CL0, CLa, CD0, k, Tmax, Iy = params
 
-    def forces_moments(self, s: State, c: Control) -> Tuple[np.ndarray, float]:
-        """
-        Returns body-axis forces [X, Z] (Z positive down) and pitch moment M about y.
-        Toy aero model: CL(alpha), CD(CL), simple elevator pitch moment.
-        """
-        p = self.p
+    # Only V^2 is needed (dynamic pressure); floor matches V >= 1e-3
+    V2 = max(u*u + w*w, 1e-6)
 
-        V = math.sqrt(s.u*s.u + s.w*s.w)
-        V = max(V, 1e-3)
+    alpha = math.atan2(w, u)
 
-        alpha = math.atan2(s.w, s.u)  # rad
+    qbar = 0.5 * rho * V2
+    CL = CL0 + CLa * alpha
+    CD = CD0 + k * (CL**2)
 
-        qbar = 0.5 * p.rho * V*V
-        CL = p.CL0 + p.CLa * alpha
-        CD = p.CD0 + p.k * (CL**2)
+    L = qbar * S * CL
+    D = qbar * S * CD
 
-        L = qbar * p.S * CL          # lift (perp to V)
-        D = qbar * p.S * CD          # drag (opposite to V)
+    sa, ca = math.sin(alpha), math.cos(alpha)
+    Xa = -D * ca + -L * sa
+    Za = -D * sa +  L * ca
 
-        # Resolve aerodynamic forces to body axes (X forward, Z down)
-        # Using alpha: wind to body rotation
-        Xa = -D * math.cos(alpha) + -L * math.sin(alpha)
-        Za = -D * math.sin(alpha) +  L * math.cos(alpha)  # down positive
+    st, ct = math.sin(theta), math.cos(theta)  # shared by weight and kinematics
+    Xw = -mass * g * st
+    Zw =  mass * g * ct
 
-        # Thrust along body X
-        T = p.Tmax * float(np.clip(c.throttle, 0.0, 1.0))
+    X = Xa + T + Xw
+    Z = Za + Zw
 
-        # Weight in body axes: rotate inertial down (g) into body frame by theta
-        # In inertial: weight = [0, mg] down (z down). Convert to body:
-        Xw = -p.mass * p.g * math.sin(s.theta)
-        Zw =  p.mass * p.g * math.cos(s.theta)
+    M = M_elev - 800.0 * q
 
-        X = Xa + T + Xw
-        Z = Za + Zw
+    du = X / mass + q * w
+    dw = Z / mass - q * u
 
-        # Toy pitch moment: elevator + damping
-        # (later: use Cm(alpha, q, de))
-        M = -4000.0 * c.elevator - 800.0 * s.q
+    dx =  ct * u - st * w
+    dz =  st * u + ct * w
 
-        return np.array([X, Z], dtype=float), float(M)
+    return dx, dz, du, dw, q, M / Iy
 
-    def dynamics(self, s: State, c: Control) -> np.ndarray:
-        """
-        Returns time-derivative of state vector [x,z,u,w,theta,q]
-        """
-        p = self.p
-        F, M = self.forces_moments(s, c)
 
-        X, Z = F[0], F[1]
+@njit(cache=True, fastmath=True)
+def rk4_step_jit(y, throttle, elevator, params, dt):
+    """
+    One RK4 step of the state array y = [x, z, u, w, theta, q], in place.
+    params is AircraftModel.params.
+    """
+    x, z, u, w, theta, q = y[0], y[1], y[2], y[3], y[4], y[5]
+    h2 = 0.5 * dt
 
-        # Translational equations in body frame (2D)
-        du = X / p.mass + s.q * s.w
-        dw = Z / p.mass - s.q * s.u
+    # Controls are constant over the step: thrust and elevator moment once, not per substage
+    Tmax = params[8]
+    T = Tmax * min(max(throttle, 0.0), 1.0)
+    M_elev = -4000.0 * elevator
 
-        # Kinematics: convert body velocity to inertial rates
-        # inertial x forward, z down; rotate by theta
-        dx =  math.cos(s.theta) * s.u - math.sin(s.theta) * s.w
-        dz =  math.sin(s.theta) * s.u + math.cos(s.theta) * s.w
+    k1x, k1z, k1u, k1w, k1t, k1q = _derivs(u, w, theta, q, T, M_elev, params)
+    k2x, k2z, k2u, k2w, k2t, k2q = _derivs(u + h2*k1u, w + h2*k1w, theta + h2*k1t, q + h2*k1q,
+                                           T, M_elev, params)
+    k3x, k3z, k3u, k3w, k3t, k3q = _derivs(u + h2*k2u, w + h2*k2w, theta + h2*k2t, q + h2*k2q,
+                                           T, M_elev, params)
+    k4x, k4z, k4u, k4w, k4t, k4q = _derivs(u + dt*k3u, w + dt*k3w, theta + dt*k3t, q + dt*k3q,
+                                           T, M_elev, params)
 
-        dtheta = s.q
-        dq = M / p.Iy
+    c = dt / 6.0
+    y[0] = x + c*(k1x + 2*k2x + 2*k3x + k4x)
+    y[1] = z + c*(k1z + 2*k2z + 2*k3z + k4z)
+    y[2] = u + c*(k1u + 2*k2u + 2*k3u + k4u)
+    y[3] = w + c*(k1w + 2*k2w + 2*k3w + k4w)
+    y[4] = theta + c*(k1t + 2*k2t + 2*k3t + k4t)
+    y[5] = q + c*(k1q + 2*k2q + 2*k3q + k4q)
 
-        return np.array([dx, dz, du, dw, dtheta, dq], dtype=float)
 
+def rk4_step(model: AircraftModel, y: np.ndarray, throttle: float, elevator: float, dt: float) -> np.ndarray:
+    """
+    Advance y by one RK4 step in place; returns y.
+    """
+    rk4_step_jit(y, float(throttle), float(elevator), model.params, float(dt))
+    return y
 
-def rk4_step(model: AircraftModel, s: State, c: Control, dt: float) -> State:
-    y0 = np.array([s.x, s.z, s.u, s.w, s.theta, s.q], dtype=float)
 
-    def f(y: np.ndarray) -> np.ndarray:
-        ss = State(*y.tolist())
-        return model.dynamics(ss, c)
+# Logger columns, in buffer order
+LOG_COLUMNS = ("t", "x", "z", "u", "w", "V", "theta", "q", "alpha", "throttle", "elevator")
 
-    k1 = f(y0)
-    k2 = f(y0 + 0.5*dt*k1)
-    k3 = f(y0 + 0.5*dt*k2)
-    k4 = f(y0 + dt*k3)
 
-    y1 = y0 + (dt/6.0)*(k1 + 2*k2 + 2*k3 + k4)
-    return State(*y1.tolist())
+@njit(cache=True, fastmath=True)
+def _log_row(buf, i, t, y, throttle, elevator):
+    x, z, u, w, theta, q = y[0], y[1], y[2], y[3], y[4], y[5]
+    buf[i, 0] = t
+    buf[i, 1] = x
+    buf[i, 2] = z
+    buf[i, 3] = u
+    buf[i, 4] = w
+    buf[i, 5] = math.hypot(u, w)
+    buf[i, 6] = theta
+    buf[i, 7] = q
+    buf[i, 8] = math.atan2(w, u)
+    buf[i, 9] = throttle
+    buf[i, 10] = elevator
 
 
 class Logger:
-    def __init__(self):
-        self.rows: List[Dict[str, float]] = []
-
-    def log(self, t: float, s: State, c: Control):
-        V = math.sqrt(s.u*s.u + s.w*s.w)
-        alpha = math.atan2(s.w, s.u)
-        self.rows.append({
-            "t": t,
-            "x": s.x,
-            "z": s.z,
-            "u": s.u,
-            "w": s.w,
-            "V": V,
-            "theta": s.theta,
-            "q": s.q,
-            "alpha": alpha,
-            "throttle": c.throttle,
-            "elevator": c.elevator,
-        })
+    def __init__(self, max_samples: int):
+        # Preallocated rows, one per logged sample (no per-sample dict / float boxing)
+        self.buf = np.empty((max_samples, len(LOG_COLUMNS)), dtype=float)
+        self.i = 0
 
+    def log(self, t: float, y: np.ndarray, throttle: float, elevator: float):
+        _log_row(self.buf, self.i, float(t), y, float(throttle), float(elevator))
+        self.i += 1
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        Logged samples so far, shape (n, len(LOG_COLUMNS)) (a view, not a copy).
+        """
+        return self.buf[:self.i]
+
+    def row(self, k: int) -> Dict[str, float]:
+        return dict(zip(LOG_COLUMNS, self.data[k].tolist()))
+
+
+@njit(cache=True, fastmath=True)
+def elevator_schedule(t):
+    # Example: simple “pilot input” schedule
+    if 3.0 < t < 6.0:
+        return math.radians(-2.0)  # pull up (negative elevator in this toy sign)
+    return 0.0
 
-def main():
-    cfg = SimConfig(dt=0.01, t_final=30.0, real_time=True, log_hz=20)
-    p = AircraftParams()
-    model = AircraftModel(p)
-    s = State(x=0.0, z=0.0, u=60.0, w=0.0, theta=0.0, q=0.0)
-    c = Control(throttle=0.5, elevator=0.0)
 
-    logger = Logger()
+@njit(cache=True)
+def _march(y, throttle, params, dt, t_final, log_dt, buf):
+    """
+    Batch loop: RK4 from t=0 to t_final, logging every log_dt into buf.
+    Returns the number of rows written.
+    """
+    t = 0.0
+    next_log_t = 0.0
+    i = 0
+    while t < t_final:
+        elevator = elevator_schedule(t)
+        rk4_step_jit(y, throttle, elevator, params, dt)
+        t += dt
+
+        if t >= next_log_t:
+            _log_row(buf, i, t, y, throttle, elevator)
+            i += 1
+            next_log_t += log_dt
+    return i
+
+
+def new_logger(cfg: SimConfig) -> Logger:
+    return Logger(int(math.ceil(cfg.t_final * cfg.log_hz)) + 2)
+
+
+def run_batch(cfg: SimConfig, model: AircraftModel, y: np.ndarray, throttle: float) -> Logger:
+    """
+    Whole run inside one jitted loop, no wall-clock pacing. y is advanced in place.
+    """
+    logger = new_logger(cfg)
+    logger.i = _march(y, float(throttle), model.params, float(cfg.dt), float(cfg.t_final),
+                      1.0 / cfg.log_hz, logger.buf)
+    return logger
+
+
+def run_realtime(cfg: SimConfig, model: AircraftModel, y: np.ndarray, throttle: float) -> Logger:
+    """
+    Step-by-step Python loop paced to the wall clock. y is advanced in place.
+    """
+    logger = new_logger(cfg)
 
     t = 0.0
     next_log_t = 0.0
     log_dt = 1.0 / cfg.log_hz
 
     wall_start = time.perf_counter()
-    last_wall = wall_start
 
     while t < cfg.t_final:
-        # Example: simple “pilot input” schedule
-        if 3.0 < t < 6.0:
-            c.elevator = math.radians(-2.0)  # pull up (negative elevator in this toy sign)
-        else:
-            c.elevator = 0.0
+        elevator = elevator_schedule(t)
 
-        s = rk4_step(model, s, c, cfg.dt)
+        rk4_step(model, y, throttle, elevator, cfg.dt)
         t += cfg.dt
 
         if t >= next_log_t:
-            logger.log(t, s, c)
+            logger.log(t, y, throttle, elevator)
             next_log_t += log_dt
 
-        if cfg.real_time:
-            # pace to real time
-            target = wall_start + t
-            now = time.perf_counter()
-            sleep_s = target - now
-            if sleep_s > 0:
-                time.sleep(sleep_s)
-            last_wall = now
+        # pace to real time
+        sleep_s = wall_start + t - time.perf_counter()
+        if sleep_s > 0:
+            time.sleep(sleep_s)
+
+    return logger
+
+
+def main():
+    cfg = SimConfig(dt=0.01, t_final=30.0, real_time=True, log_hz=20)
+    p = AircraftParams()
+    model = AircraftModel(p)
+    y = make_state(x=0.0, z=0.0, u=60.0, w=0.0, theta=0.0, q=0.0)
+    throttle = 0.5
+
+    run = run_realtime if cfg.real_time else run_batch
+    logger = run(cfg, model, y, throttle)
 
     # Print a small summary
-    last = logger.rows[-1]
+    last = logger.row(-1)
     print("Final:", {k: round(v, 3) for k, v in last.items() if k in ["t","x","z","V","theta","alpha"]})
-    print(f"Logged {len(logger.rows)} samples.")
+    print(f"Logged {logger.i} samples.")
 
 
 if __name__ == "__main__":
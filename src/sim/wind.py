@@ -1,3 +1,5 @@
+import math
+
 import numpy as np
 
 class WindModel:
@@ -6,17 +8,51 @@ class WindModel:
         self.Vwx0 = float(Vwx)
         self.Vwy0 = float(Vwy)
         self.gust_amp = float(gust_amp)
-        self.w = 2.0 * np.pi * float(gust_freq_hz)
+        self.w = 2.0 * math.pi * float(gust_freq_hz)
         self.random_gust_std = float(random_gust_std)
         self.rng = np.random.default_rng(int(seed))
 
+        # Pregenerated per-step wind (see pregenerate / sample_step)
+        self.dt = None
+        self.Vwx_buf = np.empty(0)
+        self.Vwy_buf = np.empty(0)
+
     def sample(self, t: float):
         # Smooth gust (sinusoid) + small random component (white-noise-ish)
-        gx = self.gust_amp * np.sin(self.w * t)
-        gy = self.gust_amp * np.cos(self.w * t)
+        gx = self.gust_amp * math.sin(self.w * t)
+        gy = self.gust_amp * math.cos(self.w * t)
 
         rx = self.rng.normal(0.0, self.random_gust_std)
         ry = self.rng.normal(0.0, self.random_gust_std)
 
         return (self.Vwx0 + gx + rx), (self.Vwy0 + gy + ry)
 
+    def sample_series(self, t):
+        """
+        Vectorized sample() over a time array: returns (Vwx[N], Vwy[N]).
+        Draws the same random stream as N successive sample() calls.
+        """
+        t = np.asarray(t, dtype=float)
+        gx = self.gust_amp * np.sin(self.w * t)
+        gy = self.gust_amp * np.cos(self.w * t)
+
+        r = self.rng.normal(0.0, self.random_gust_std, size=(t.size, 2))
+
+        return (self.Vwx0 + gx + r[:, 0]), (self.Vwy0 + gy + r[:, 1])
+
+    def pregenerate(self, dt: float, n: int):
+        """
+        Draw the wind for steps 0..n-1 (t = i*dt) in one vectorized call,
+        so stepping loops read it with sample_step(i) instead of sampling per tick.
+        """
+        self.dt = float(dt)
+        self.Vwx_buf, self.Vwy_buf = self.sample_series(np.arange(int(n)) * self.dt)
+
+    def sample_step(self, i: int):
+        """
+        Wind at step i from the pregenerated buffers. Past their end it falls back
+        to sample(i*dt), which continues the same random stream.
+        """
+        if i < self.Vwx_buf.size:
+            return float(self.Vwx_buf[i]), float(self.Vwy_buf[i])
+        return self.sample(i * self.dt)
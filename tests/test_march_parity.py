@@ -0,0 +1,143 @@
+"""
+Builds of the approach march against run_sim._march run as plain Python
+(NUMBA_DISABLE_JIT, in a subprocess so this process and other test modules keep numba),
+so an edit to step_state / guidance_compute that a build did not pick up shows up here.
+The jitted _march is always checked; the optional AOT / Cython builds are skipped when
+not built.
+
+    python -m unittest discover tests     (or: python -m pytest tests)
+"""
+import copy
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+import numpy as np
+import yaml
+
+import run_sim
+from sim.factory import build_from_config
+
+CONFIG = os.path.join(HERE, "..", "configs", "baseline.yaml")
+
+
+def load_cfg(**wind):
+    with open(CONFIG, "r") as f:
+        cfg = yaml.safe_load(f)
+    cfg["wind"] = {**(cfg.get("wind") or {}), **wind}
+    return cfg
+
+
+def baseline_cfg():
+    # Calm air: only rounding separates the builds
+    return load_cfg()
+
+
+def gusty_cfg():
+    # Gusts make the lateral loop amplify rounding differences roughly exponentially
+    # (mm after ~80 s, up to metres by touchdown), so compare the first 40 s only
+    cfg = load_cfg(random_gust_std=1.0, gust_amp=2.0, gust_freq_hz=0.05, seed=3)
+    cfg["simulation"]["total_time"] = 40.0
+    return cfg
+
+
+CASES = {"baseline": baseline_cfg, "gusty": gusty_cfg}
+
+
+def march(fn, cfg, stop=True):
+    """
+    One run of fn (same arguments as run_sim._march) from cfg; returns (log, n, end).
+    """
+    model, guidance, wind = build_from_config(copy.deepcopy(cfg))
+    approach = cfg["approach"]
+    dt = float(cfg["simulation"]["dt"])
+    N = int(np.ceil(cfg["simulation"]["total_time"] / dt))
+    Vwx, Vwy = wind.sample_series(np.arange(N) * dt)
+    log = np.empty((N, len(run_sim.LOG_KEYS)))
+    n, end = fn(model.state_vector(), model.params, guidance.params, Vwx, Vwy, dt,
+                float(approach["x_threshold"]), float(approach.get("x_window", 2000.0)),
+                float(approach.get("h_ground", 1.0)), stop, log)
+    return log[:n, :run_sim.LOG_COLS["href"]], int(n), int(end)
+
+
+def write_reference(path):
+    """
+    Every case marched with run_sim._march into an .npz (run by the subprocess below).
+    """
+    out = {}
+    for name, make_cfg in CASES.items():
+        log, n, end = march(run_sim._march, make_cfg())
+        out[name] = log
+        out[name + "_n_end"] = np.array([n, end])
+    np.savez(path, **out)
+
+
+REFERENCE = {}
+
+
+def setUpModule():
+    # _march as plain Python, in a child process with numba disabled
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reference.npz")
+        env = {**os.environ, "NUMBA_DISABLE_JIT": "1"}
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--reference", path],
+                       env=env, check=True)
+        with np.load(path) as ref:
+            REFERENCE.update({k: ref[k] for k in ref.files})
+
+
+class MarchParity:
+    """
+    Mixin: self.run_march is the march under test.
+    """
+    run_march = None
+
+    def check(self, case, atol=1e-8):
+        got, n, end = march(self.run_march, CASES[case]())
+        self.assertEqual((n, end), tuple(int(v) for v in REFERENCE[case + "_n_end"]))
+        np.testing.assert_allclose(got, REFERENCE[case], rtol=0.0, atol=atol)
+
+    def test_baseline(self):
+        self.check("baseline")
+
+    def test_gusty(self):
+        self.check("gusty")
+
+
+class TestJitMarch(MarchParity, unittest.TestCase):
+    # numba's fastmath kernels round differently from plain Python
+    run_march = staticmethod(run_sim._march)
+
+
+try:
+    import sim_ext
+except ImportError:
+    sim_ext = None
+
+
+@unittest.skipIf(sim_ext is None, "sim_ext not built (python src/build_sim_ext.py)")
+class TestAOTMarch(MarchParity, unittest.TestCase):
+    run_march = staticmethod(sim_ext.run_march) if sim_ext is not None else None
+
+
+try:
+    from sim import _kernel
+except ImportError:
+    _kernel = None
+
+
+@unittest.skipIf(_kernel is None, "sim._kernel not built (python setup.py build_ext --inplace)")
+class TestCythonMarch(MarchParity, unittest.TestCase):
+    run_march = staticmethod(_kernel.run_march) if _kernel is not None else None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--reference":
+        write_reference(sys.argv[2])
+    else:
+        unittest.main()